@@ -1,68 +1,540 @@
-import streamlit as st
-import pandas as pd
-import joblib
-import gdown
-import pickle
-import os
-
-class Recommender:
-    def __init__(self, model_path="DATA/emotion_score_model.pkl", data_path="DATA/movie_df_ml.csv"):
-        self.get_model_from_data_folder()
-        self.model = joblib.load(model_path)
-        self.movie_df = pd.read_csv(
-                            data_path,
-                            encoding="ISO-8859-1",
-                            on_bad_lines="skip"
-                        )
-        self.movie_df["emotion_score"] = pd.to_numeric(self.movie_df["emotion_score"], errors="coerce")
-        self.X_columns = self.model.feature_names_in_
-
-    @st.cache_resource
-    def get_model_from_data_folder(_self=None):
-        print("Downloading model")
-        MODEL_URL = os.getenv("MODEL_URL") or st.secrets.get("MODEL_URL")
-        output_path = os.path.join("DATA", "emotion_score_model.pkl")
-
-        if not os.path.exists(output_path):
-            print("Downloading model with gdown")
-            gdown.download(MODEL_URL, output_path, quiet=False)
-
-        with open(output_path, "rb") as f:
-            print("Model loaded")
-            model = pickle.load(f)
-
-        return model
-
-    def recommend_varied_films(self, genre_keyword, tolerance=3.0, top_n=3, candidate_pool=15):
-        matched_cols = [col for col in self.X_columns if genre_keyword.lower() in col.lower()]
-
-        if not matched_cols:
-            pool = self.movie_df.sort_values(by="final_popularity", ascending=False).head(candidate_pool)
-            sampled = pool.sample(n=min(top_n, len(pool)), random_state=None)
-            return sampled[["title", "final_popularity", "vote_average", "genre_group"]]
-
-        input_df = pd.DataFrame(data=[0]*len(self.X_columns), index=self.X_columns).T
-        input_df.columns = self.X_columns
-        for col in matched_cols:
-            input_df.at[0, col] = 1
-
-        try:
-            predicted_score = self.model.predict(input_df)[0]
-        except:
-            pool = self.movie_df.sort_values(by="final_popularity", ascending=False).head(candidate_pool)
-            sampled = pool.sample(n=min(top_n, len(pool)), random_state=None)
-            return sampled[["title", "final_popularity", "vote_average", "genre_group"]]
-
-        mask = self.movie_df["emotion_score"].between(predicted_score - tolerance, predicted_score + tolerance)
-        filtered = self.movie_df[mask]
-
-        if filtered.empty:
-            pool = self.movie_df.sort_values(by="final_popularity", ascending=False).head(candidate_pool)
-            sampled = pool.sample(n=min(top_n, len(pool)), random_state=None)
-            return sampled[["title", "final_popularity", "vote_average", "genre_group"]]
-
-        filtered_sorted = filtered.sort_values(by="final_score", ascending=False).head(candidate_pool)
-        sampled = filtered_sorted.sample(n=min(top_n, len(filtered_sorted)), random_state=None)
-
-        return sampled[["title", "emotion_score", "vote_average", "final_score", "genre_group"]]
-
+import streamlit as st
+import pandas as pd
+import numpy as np
+import joblib
+import gdown
+import os
+import threading
+import hashlib
+import time
+import telemetry
+from cache_store import MemoryCache
+from catalog_store import load_or_convert
+from genre_index import GenreIndex
+from movie_index import ARRAYS as INDEX_ARRAYS, load_or_build, scale_query
+from poster_index import POSTER_INDEX_PATH, poster_urls
+
+MODEL_PATH = os.path.join("DATA", "emotion_score_model.pkl")
+DATA_PATH = os.path.join("DATA", "movie_df_ml.csv")
+POPULARITY_COLUMNS = ["title", "final_popularity", "vote_average", "genre_group"]
+SCORED_COLUMNS = ["title", "emotion_score", "vote_average", "final_score", "genre_group"]
+# Motorun katalogdan kullandığı sütunlar (model tür sütunları bunlara eklenir)
+CATALOG_COLUMNS = ["title", "genre_group", "emotion_score", "vote_average", "final_score", "final_popularity"]
+
+WARMUP_RETRY_SECONDS = float(os.getenv("MODEL_WARMUP_RETRY_SECONDS", 60))
+# Model diskteyken bir oturumun motor yüklemesini en fazla bekleyeceği süre; aşılırsa katalog yedeği kullanılır
+ENGINE_WAIT_SECONDS = float(os.getenv("ENGINE_WAIT_SECONDS", 5))
+# (tür, tolerans, havuz boyutu) -> aday havuzu; her istekte yalnızca rastgele seçim yapılır.
+# Popülerlik havuzu da aynı önbellekte, sabit POPULARITY_POOL_KEY anahtarıyla tutulur.
+POPULARITY_POOL_KEY = "<popularity>"
+POOL_CACHE_SIZE = int(os.getenv("POOL_CACHE_SIZE", 512))
+POOL_CACHE_TTL = float(os.getenv("POOL_CACHE_TTL", 3600))
+
+
+def _secret(name):
+    try:
+        return os.getenv(name) or st.secrets.get(name)
+    except Exception:
+        # secrets.toml hiç yoksa st.secrets hata fırlatır
+        return None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch_model_artifact(output_path=MODEL_PATH, url=None, sha256=None):
+    # Model geçici dosyaya indirilir, sağlama toplamı doğrulanır ve atomik rename ile yerine konur;
+    # yarım kalan bir indirme asla MODEL_PATH'te bozuk bir pickle bırakmaz
+    sha256 = sha256 or _secret("MODEL_SHA256")
+    if os.path.exists(output_path):
+        if not sha256 or file_sha256(output_path) == sha256.lower():
+            return output_path
+        print("Model checksum mismatch, downloading again")
+
+    url = url or _secret("MODEL_URL")
+    if not url:
+        raise RuntimeError("MODEL_URL is not configured and the model file is missing")
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        print("Downloading model with gdown")
+        with telemetry.span("model.download"):
+            gdown.download(url, tmp_path, quiet=True)
+        if not os.path.exists(tmp_path):
+            raise RuntimeError("Model download failed")
+        digest = file_sha256(tmp_path)
+        if sha256 and digest != sha256.lower():
+            raise ValueError(f"Model checksum mismatch: expected {sha256}, got {digest}")
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+class Recommender:
+    ready = True
+
+    def __init__(self, model_path=MODEL_PATH, data_path=DATA_PATH, poster_index_path=POSTER_INDEX_PATH):
+        self.model = self.get_model_from_data_folder(model_path)
+        self.X_columns = self.model.feature_names_in_
+        self.load_catalog(data_path, CATALOG_COLUMNS + [str(c) for c in self.X_columns])
+        self.attach_posters(poster_index_path)
+        self.build_indexes()
+        self.build_pool_cache()
+        self.build_genre_scores()
+        self.build_genre_matrix()
+        self.build_movie_index(data_path)
+
+    def get_model_from_data_folder(self, output_path=MODEL_PATH):
+        fetch_model_artifact(output_path)
+
+        # joblib.load hem joblib hem de düz pickle dosyalarını okuyabilir
+        with telemetry.span("model.load"):
+            model = joblib.load(output_path)
+        print("Model loaded")
+        return model
+
+    def load_catalog(self, data_path, columns=CATALOG_COLUMNS):
+        # CSV yalnızca ilk açılışta (veya değişince) ayrıştırılır; sonrası DATA/catalog'dan memory-map.
+        # Yalnızca kullanılan sütunlar okunur: skorlar float32, title/genre_group kategorik.
+        directory = os.path.join(os.path.dirname(data_path), "catalog")
+        with telemetry.span("catalog.load"):
+            self.movie_df, meta = load_or_convert(data_path, _file_signature(data_path), directory, columns)
+        self.catalog_signature = meta.get("source") or []
+
+    def memory_report(self):
+        # Katalog sütunları ve motor dizileri; memory-map olanlar süreçler arasında paylaşılır
+        rows = []
+        for column in self.movie_df.columns:
+            size, mapped = _nbytes(self.movie_df[column])
+            rows.append({"component": f"catalog.{column}", "dtype": str(self.movie_df[column].dtype),
+                         "bytes": size, "memory_mapped": mapped})
+        arrays = {f"engine.{name.lstrip('_')}": value for name, value in vars(self).items()
+                  if isinstance(value, np.ndarray)}
+        if getattr(self, "movie_index", None) is not None:
+            arrays.update({f"movie_index.{name}": getattr(self.movie_index, name) for name in INDEX_ARRAYS})
+        for name, value in arrays.items():
+            size, mapped = _nbytes(value)
+            rows.append({"component": name, "dtype": str(value.dtype), "bytes": size, "memory_mapped": mapped})
+        return rows
+
+    def warm_up(self):
+        # Tek satırlık sahte predict ve bir öneri: sklearn/pandas'ın ilk çağrı maliyeti kullanıcıya yansımaz
+        with telemetry.span("model.warm_up"):
+            self.model.predict(pd.DataFrame(np.zeros((1, len(self.X_columns))), columns=self.X_columns))
+            self.recommend_varied_films(str(self.X_columns[0]) if len(self.X_columns) else "NotValid")
+
+    def attach_posters(self, poster_index_path):
+        # Çevrimdışı afiş indeksi varsa sonuçlar afiş URL'sini doğrudan taşır
+        posters = poster_urls(poster_index_path)
+        if posters:
+            self.movie_df["poster_url"] = self.movie_df["title"].map(posters)
+
+    def result_columns(self, columns):
+        if "poster_url" in self.movie_df:
+            return columns + ["poster_url"]
+        return columns
+
+    def result_rows(self, rows, columns):
+        # Tür sütunları kopyalanmasın: yalnızca sonuç sütunları seçilir
+        return self.movie_df.iloc[rows, self.movie_df.columns.get_indexer(self.result_columns(columns))]
+
+    def build_indexes(self):
+        # emotion_score'a göre sıralı dizi: tolerans penceresi ikili arama ile bulunur
+        self._emotion = self.movie_df["emotion_score"].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(self._emotion))
+        self._emotion_order = valid[np.argsort(self._emotion[valid], kind="stable")]
+        self._emotion_sorted = self._emotion[self._emotion_order]
+
+        # final_score ve final_popularity için önceden sıralanmış havuzlar
+        self._final_score = pd.to_numeric(self.movie_df["final_score"], errors="coerce").to_numpy(dtype=float)
+        popularity = pd.to_numeric(self.movie_df["final_popularity"], errors="coerce").to_numpy(dtype=float)
+        self._score_order = _descending_order(self._final_score)
+        self._popularity_order = _descending_order(popularity)
+
+    def build_pool_cache(self):
+        self._pool_cache = MemoryCache("candidate_pools", POOL_CACHE_SIZE, POOL_CACHE_TTL)
+
+    def popularity_pool(self, candidate_pool=15):
+        key = (POPULARITY_POOL_KEY, None, int(candidate_pool))
+        pool = self._pool_cache.get(key)
+        if pool is None:
+            pool = _plain(self.result_rows(self._popularity_order[:candidate_pool], POPULARITY_COLUMNS))
+            self._pool_cache.put(key, pool)
+        return pool
+
+    def popularity_fallback(self, top_n=3, candidate_pool=15, seed=None):
+        return _draw(self.popularity_pool(candidate_pool), top_n, seed)
+
+    def emotion_window_pool(self, predicted_score, tolerance=3.0, candidate_pool=15):
+        low, high = predicted_score - tolerance, predicted_score + tolerance
+        start = np.searchsorted(self._emotion_sorted, low, side="left")
+        stop = np.searchsorted(self._emotion_sorted, high, side="right")
+        window = self._emotion_order[start:stop]
+
+        if len(window) == 0:
+            return window
+
+        # Pencere kataloğun çoğunu kapsıyorsa final_score sırasında ilerlemek daha ucuz
+        if len(window) * 2 > len(self._emotion_order):
+            return self._top_scored_in_range(low, high, candidate_pool)
+
+        if len(window) > candidate_pool:
+            top = np.argpartition(-self._final_score[window], candidate_pool - 1)[:candidate_pool]
+            window = window[top]
+        return window[_descending_order(self._final_score[window])]
+
+    def _top_scored_in_range(self, low, high, candidate_pool, step=256):
+        picked = []
+        found = 0
+        for offset in range(0, len(self._score_order), step):
+            chunk = self._score_order[offset:offset + step]
+            values = self._emotion[chunk]
+            chunk = chunk[(values >= low) & (values <= high)]
+            picked.append(chunk)
+            found += len(chunk)
+            if found >= candidate_pool:
+                break
+        return np.concatenate(picked)[:candidate_pool]
+
+    def build_genre_scores(self):
+        # Tür anahtar kelimesi -> tahmini emotion_score tablosu.
+        # Eşleşen sütun yoksa değer None olur; başarısız tahminler saklanmaz, sonraki istekte yeniden denenir.
+        self.genre_index = GenreIndex(self.X_columns)
+        self._genre_scores = {}
+        self._column_scores = {}
+        self._genre_scores_lock = threading.Lock()
+        self.warm_genre_scores(self.X_columns)
+
+    def build_genre_matrix(self):
+        # Katalog x model tür sütunları (0/1) matrisi; kataloğun tamamı tek matris çarpımıyla puanlanır.
+        # Katalogda bulunmayan sütunlar sıfır kalır.
+        genres = self.movie_df.reindex(columns=self.X_columns, fill_value=0)
+        genres = genres.apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy() > 0
+        self._genre_matrix = genres.astype(np.float32)
+        self._genre_norms = np.sqrt(self._genre_matrix.sum(axis=1))
+        self._genre_norms[self._genre_norms == 0] = 1.0
+        self._column_position = {column: i for i, column in enumerate(self.X_columns)}
+
+        emotion = self._emotion.astype(np.float32)
+        self._emotion32 = np.where(np.isnan(emotion), np.inf, emotion)
+        quality = np.nan_to_num(self._final_score, nan=0.0)
+        span = quality.max() - quality.min() if len(quality) else 0.0
+        self._quality = ((quality - quality.min()) / span if span else np.ones_like(quality)).astype(np.float32)
+
+    def build_movie_index(self, data_path):
+        # İndeks kataloğun yanında (DATA/movie_index) saklanır; CSV veya model sütunları değişince yeniden kurulur
+        signature = [list(self.catalog_signature), len(self.movie_df), [str(c) for c in self.X_columns]]
+        directory = os.path.join(os.path.dirname(data_path), "movie_index")
+        with telemetry.span("movie_index.load"):
+            self.movie_index = load_or_build(self._genre_matrix, self.movie_df, signature, directory)
+        self._index_position = np.empty(len(self.movie_index), dtype=np.int64)
+        self._index_position[self.movie_index.ids] = np.arange(len(self.movie_index))
+        self._title_rows = None
+
+    def movie_vector(self, genres=(), emotion_score=None, vote_average=None, popularity=None):
+        genre_vector = np.zeros(len(self.X_columns), dtype=np.float32)
+        for keyword in genres:
+            for col in self.genre_index.resolve(keyword):
+                genre_vector[self._column_position[col]] = 1.0
+        numeric = {"emotion_score": emotion_score, "vote_average": vote_average, "final_popularity": popularity}
+        return scale_query(genre_vector, numeric, self.movie_index.meta["scaling"])
+
+    def nearest_movies(self, query, k=10, approximate=False, exclude=()):
+        rows, distances = self.movie_index.search(query, k + len(exclude), approximate=approximate)
+        if len(exclude):
+            keep = ~np.isin(rows, list(exclude))
+            rows, distances = rows[keep], distances[keep]
+        result = _plain(self.result_rows(rows[:k], SCORED_COLUMNS))
+        result.insert(len(result.columns), "distance", distances[:k])
+        return result
+
+    def similar_movies(self, title, k=10, approximate=False):
+        if self._title_rows is None:
+            titles = self.movie_df["title"].astype(str).to_numpy()
+            self._title_rows = {t: row for row, t in reversed(list(enumerate(titles)))}
+        row = self._title_rows.get(title)
+        if row is None:
+            return _plain(self.result_rows([], SCORED_COLUMNS)).assign(distance=[])
+        query = self.movie_index.vectors[self._index_position[row]]
+        return self.nearest_movies(query, k, approximate=approximate, exclude=(row,))
+
+    def taste_profile(self, genre_counts):
+        # Ağırlıklı tür sayımı -> (X_columns üzerinde birim tür vektörü, ağırlıklı hedef emotion_score)
+        weights = {}
+        for keyword, count in genre_counts.items():
+            if count > 0:
+                weights[keyword.lower()] = weights.get(keyword.lower(), 0) + count
+        self.warm_genre_scores(weights)
+
+        vector = np.zeros(len(self.X_columns), dtype=np.float32)
+        score_sum = weight_sum = 0.0
+        for keyword, weight in weights.items():
+            cols = self.genre_index.resolve(keyword)
+            if not cols:
+                continue
+            vector[[self._column_position[col] for col in cols]] += weight / len(cols)
+            score = self._genre_scores.get(keyword)
+            if score is not None:
+                score_sum += weight * score
+                weight_sum += weight
+
+        norm = np.linalg.norm(vector)
+        if not norm or not weight_sum:
+            return None, None
+        return vector / norm, score_sum / weight_sum
+
+    def taste_scores(self, genre_counts, tolerance=3.0):
+        # Tür benzerliği (kosinüs) x emotion yakınlığı x final_score; tüm katalog için tek seferde
+        vector, target = self.taste_profile(genre_counts)
+        if vector is None:
+            return None
+        affinity = (self._genre_matrix @ vector) / self._genre_norms
+        closeness = np.clip(1.0 - np.abs(self._emotion32 - target) / tolerance, 0.0, None)
+        return affinity * closeness * (0.5 + 0.5 * self._quality)
+
+    def recommend_for_taste(self, genre_counts, tolerance=3.0, top_n=3, candidate_pool=15, seed=None):
+        scores = self.taste_scores(genre_counts, tolerance)
+        if scores is None:
+            return self.popularity_fallback(top_n, candidate_pool, seed)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) == 0:
+            return self.popularity_fallback(top_n, candidate_pool, seed)
+        if len(candidates) > candidate_pool:
+            top = np.argpartition(-scores[candidates], candidate_pool - 1)[:candidate_pool]
+            candidates = candidates[top]
+        pool_idx = candidates[_descending_order(scores[candidates])]
+
+        return _draw(_plain(self.result_rows(pool_idx, SCORED_COLUMNS)), top_n, seed)
+
+    def match_columns(self, genre_keyword):
+        return list(self.genre_index.resolve(genre_keyword))
+
+    def warm_genre_scores(self, genre_keywords):
+        # Bilinmeyen anahtar kelimelerin hepsini tek bir toplu predict ile hesapla
+        keywords = {keyword.lower() for keyword in genre_keywords} - self._genre_scores.keys()
+        if not keywords:
+            return
+
+        keyword_columns = {keyword: self.genre_index.resolve(keyword) for keyword in keywords}
+        missing = sorted({cols for cols in keyword_columns.values() if cols} - self._column_scores.keys())
+
+        column_scores = {}
+        if missing:
+            rows = [np.isin(self.X_columns, cols).astype(int) for cols in missing]
+            input_df = pd.DataFrame(np.vstack(rows), columns=self.X_columns)
+            try:
+                with telemetry.span("model.predict"):
+                    predictions = [float(p) for p in self.model.predict(input_df)]
+            except Exception as e:
+                print(f"Genre score prediction error: {e}")
+                predictions = []
+            column_scores = dict(zip(missing, predictions))
+
+        with self._genre_scores_lock:
+            self._column_scores.update(column_scores)
+            for keyword, cols in keyword_columns.items():
+                if not cols:
+                    self._genre_scores[keyword] = None
+                elif cols in self._column_scores:
+                    self._genre_scores[keyword] = self._column_scores[cols]
+
+    def predict_genre_score(self, genre_keyword):
+        keyword = genre_keyword.lower()
+        if keyword not in self._genre_scores:
+            self.warm_genre_scores([keyword])
+        return self._genre_scores.get(keyword)
+
+    def genre_pool(self, genre_keyword, tolerance=3.0, candidate_pool=15):
+        # Aynı türü paylaşan kullanıcılar aynı havuzu alır; süzme ve sıralama anahtar başına bir kez yapılır
+        key = (genre_keyword.lower(), float(tolerance), int(candidate_pool))
+        pool = self._pool_cache.get(key)
+        if pool is None:
+            pool = self._build_genre_pool(genre_keyword, tolerance, candidate_pool)
+            # Tahmin başarısız olduysa popülerlik havuzu bu türün havuzu olarak saklanmaz
+            if key[0] in self._genre_scores:
+                self._pool_cache.put(key, pool)
+        return pool
+
+    def _build_genre_pool(self, genre_keyword, tolerance, candidate_pool):
+        predicted_score = self.predict_genre_score(genre_keyword)
+
+        if predicted_score is None:
+            return self.popularity_pool(candidate_pool)
+
+        pool_idx = self.emotion_window_pool(predicted_score, tolerance, candidate_pool)
+
+        if len(pool_idx) == 0:
+            return self.popularity_pool(candidate_pool)
+
+        return _plain(self.result_rows(pool_idx, SCORED_COLUMNS))
+
+    def recommend_varied_films(self, genre_keyword, tolerance=3.0, top_n=3, candidate_pool=15, seed=None):
+        # seed verilirse seçim tekrarlanabilir
+        return _draw(self.genre_pool(genre_keyword, tolerance, candidate_pool), top_n, seed)
+
+class CatalogRecommender(Recommender):
+    # Model hazır olmadan gelen oturumlar için: yalnızca katalog yüklenir, her öneri popülerlikten gelir
+    ready = False
+
+    def __init__(self, data_path=DATA_PATH, poster_index_path=POSTER_INDEX_PATH):
+        self.model = None
+        self.load_catalog(data_path)
+        self.attach_posters(poster_index_path)
+        self.build_indexes()
+        self.build_pool_cache()
+
+    def recommend_varied_films(self, genre_keyword, tolerance=3.0, top_n=3, candidate_pool=15, seed=None):
+        return self.popularity_fallback(top_n, candidate_pool, seed)
+
+    def recommend_for_taste(self, genre_counts, tolerance=3.0, top_n=3, candidate_pool=15, seed=None):
+        return self.popularity_fallback(top_n, candidate_pool, seed)
+
+
+def _descending_order(values):
+    # NaN değerler sona düşer
+    return np.argsort(-values, kind="stable")
+
+
+def _draw(pool, top_n, seed=None):
+    return pool.sample(n=min(top_n, len(pool)), random_state=seed)
+
+
+def _plain(frame):
+    # Sonuçlar oturumda saklanır: kategorikler tüm kategori tablosunu taşımasın diye düz metne,
+    # float32 skorlar kısa gösterimleriyle (7.1 -> 7.1, 7.099999... değil) float64'e çevrilir
+    data = {}
+    for column in frame.columns:
+        values = frame[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # astype(object) tüm kategori tablosunu dönüştürür; yalnızca seçili satırlar alınır
+            data[column] = np.asarray(values.array, dtype=object)
+        elif values.dtype == np.float32:
+            data[column] = [float(str(value)) for value in values.to_numpy()]
+        else:
+            data[column] = values.to_numpy()
+    return pd.DataFrame(data, index=frame.index, columns=frame.columns)
+
+
+def _nbytes(value):
+    # (bayt, memory-map mi); memory-map sayfaları süreçler arasında paylaşılır
+    if isinstance(value, pd.Series):
+        value = value.array if isinstance(value.dtype, pd.CategoricalDtype) else value.to_numpy()
+    if isinstance(value, pd.Categorical):
+        return int(value.codes.nbytes + value.categories.memory_usage(deep=True)), False
+    if isinstance(value, np.ndarray):
+        base = value
+        while isinstance(base, np.ndarray) and base.base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        return int(value.nbytes), isinstance(base, np.memmap) or isinstance(value, np.memmap)
+    return 0, False
+
+
+# Sunucu süreci başına tek, paylaşılan Recommender.
+# Model, CSV veya afiş indeksi diskte değişirse arka planda yeniden yüklenir; o sırada eski motor hizmet verir.
+_engine = None
+_engine_signature = None
+_engine_lock = threading.Lock()
+_fallback = None
+_fallback_signature = None
+# Yedek motor _engine_lock dışında kurulur; bu kilit yalnızca aynı anda iki kez kurulmasını önler
+_fallback_build_lock = threading.Lock()
+_warmup_thread = None
+_warmup_failed_at = None
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _engine_key(*paths):
+    return tuple((path, _file_signature(path)) for path in paths)
+
+
+def _warm_engine(model_path, data_path, poster_index_path):
+    global _engine, _engine_signature, _warmup_failed_at
+    try:
+        with telemetry.span("engine.warm_up"):
+            engine = Recommender(model_path, data_path, poster_index_path)
+            engine.warm_up()
+    except Exception as e:
+        print(f"Engine warm-up failed: {e}")
+        _warmup_failed_at = time.monotonic()
+        return
+    with _engine_lock:
+        _engine = engine
+        # Model bu sırada indirilmiş olabilir, imzayı yeniden al
+        _engine_signature = _engine_key(model_path, data_path, poster_index_path)
+        _warmup_failed_at = None
+    print("Engine ready")
+
+
+def start_engine_warmup(model_path=MODEL_PATH, data_path=DATA_PATH, poster_index_path=POSTER_INDEX_PATH):
+    # Model indirme/yükleme ve ısınma arka plan iş parçacığında; idempotent, her yeniden çalıştırmada çağrılabilir
+    global _warmup_thread
+    with _engine_lock:
+        if _warmup_thread is not None and _warmup_thread.is_alive():
+            return _warmup_thread
+        if _engine is not None and _engine_signature == _engine_key(model_path, data_path, poster_index_path):
+            return None
+        if _warmup_failed_at is not None and time.monotonic() - _warmup_failed_at < WARMUP_RETRY_SECONDS:
+            return None
+        _warmup_thread = threading.Thread(
+            target=_warm_engine,
+            args=(model_path, data_path, poster_index_path),
+            name="engine-warmup",
+            daemon=True,
+        )
+        _warmup_thread.start()
+        return _warmup_thread
+
+
+def get_fallback_recommender(data_path=DATA_PATH, poster_index_path=POSTER_INDEX_PATH):
+    global _fallback, _fallback_signature
+
+    signature = _engine_key(data_path, poster_index_path)
+    fallback = _fallback
+    if fallback is not None and signature == _fallback_signature:
+        return fallback
+
+    # Soğuk açılışta CSV ayrıştırması sürebilir; bu sırada diğer oturumlar ve ısınma bloklanmaz
+    with _fallback_build_lock:
+        if _fallback is not None and signature == _fallback_signature:
+            return _fallback
+        fallback = CatalogRecommender(data_path, poster_index_path)
+        with _engine_lock:
+            _fallback = fallback
+            _fallback_signature = signature
+    return fallback
+
+
+def get_recommender(model_path=MODEL_PATH, data_path=DATA_PATH, poster_index_path=POSTER_INDEX_PATH):
+    paths = (model_path, data_path, poster_index_path)
+    engine = _engine
+    if engine is not None and _engine_key(*paths) == _engine_signature:
+        return engine
+
+    thread = start_engine_warmup(*paths)
+    if engine is not None:
+        return engine
+
+    # Model diskteyse yükleme kısa sürer, bir süre beklenir; indirme gerekiyorsa oturum bloklanmaz
+    if thread is not None and os.path.exists(model_path):
+        thread.join(ENGINE_WAIT_SECONDS)
+        if _engine is not None:
+            return _engine
+    return get_fallback_recommender(data_path, poster_index_path)
@@ -3,19 +3,25 @@ from streamlit_option_menu import option_menu
 import urllib.parse
 import pandas as pd
 from auth import get_access_token
-from spotify_api import get_user_queue, get_artist_genres, get_user_profile
+from spotify_api import get_user_queue, get_user_profile, artist_cache
 from collections import Counter
-from playlist_analysis import PlaylistAnalyzer
-from analytic import Recommender
+from playlist_analysis import PlaylistAnalyzer, playlist_summary, playlist_cache
+from pipeline import (iter_queue_genres, analyze_queue_genres, queue_resolved, track_artist_ids, track_genres,
+                      top_genre, recommend)
+from session_cache import queue_key, playlists_key, get_analysis, store_analysis, clear_analyses
+from analytic import get_recommender, start_engine_warmup
 from dotenv import load_dotenv
-from imdb_movie_poster import get_poster_url_by_title
+from imdb_movie_poster import get_posters_for_results, poster_cache
 import plotly.express as px
-import requests
-import time
 import os
+import telemetry
+import profiler
 
 load_dotenv()
 
+# Bu yeniden çalıştırmadaki span'ler Analytics sayfasındaki Timings panelinde gösterilir
+recorder = telemetry.start_rerun()
+
 CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID") or st.secrets.get("SPOTIFY_CLIENT_ID")
 REDIRECT_URI = "https://music2movie.streamlit.app/"
 SCOPE = "user-read-email user-read-private user-read-playback-state user-top-read"
@@ -29,6 +35,156 @@ params = {
 }
 auth_url = "https://accounts.spotify.com/authorize?" + urllib.parse.urlencode(params)
 
+def queue_analysis(queue_data):
+    key = queue_key(queue_data)
+    analysis = get_analysis(key)
+    if "genre_counts" not in analysis:
+        artist_genres, queue_genre_counts = analyze_queue_genres(queue_data, access_token)
+        analysis = {"artist_genres": artist_genres, "genre_counts": queue_genre_counts}
+        # Eksik analizler oturumda saklanmaz; sonraki yüklemede yeniden denenir
+        if queue_resolved(queue_data, artist_genres):
+            analysis = store_analysis(key, **analysis)
+    return analysis
+
+
+def load_top_playlists(analyzer):
+    # Playlist listesi Refresh'e kadar oturumda tutulur
+    if st.session_state.get("all_playlists") is None:
+        st.session_state.all_playlists = analyzer.get_all_playlists()
+    all_playlists = st.session_state.all_playlists
+    top_playlists = analyzer.get_top_playlists(all_playlists) if all_playlists else []
+    return all_playlists, top_playlists
+
+
+def playlist_analysis(analyzer, top_playlists):
+    key = playlists_key(top_playlists)
+    analysis = get_analysis(key)
+    if "genre_counts" not in analysis:
+        genres, playlist_summaries = analyzer.analyze_genres_from_playlists(top_playlists)
+        analysis = {"genre_counts": genres, "playlist_summaries": playlist_summaries}
+        if not analyzer.incomplete:
+            analysis = store_analysis(key, **analysis)
+    return analysis
+
+
+SCORING_MODES = ["Top genre", "Whole taste"]
+
+
+def taste_mode():
+    return st.session_state.get("scoring_mode") == "Whole taste"
+
+
+def render_movie_suggestion(most_common_genre, cache_key=None, taste=None):
+    with telemetry.span("render", section="suggestion"):
+        _render_movie_suggestion(most_common_genre, cache_key, taste)
+
+
+def _render_movie_suggestion(most_common_genre, cache_key=None, taste=None):
+    # "Whole taste" kipinde tek tür yerine tüm ağırlıklı tür dağılımı puanlanır
+    taste = dict(taste) if taste and taste_mode() else None
+    label = most_common_genre
+    if taste and len(taste) > 1:
+        label = f"{most_common_genre} + {len(taste) - 1} more genres"
+    st.markdown(f"### 🎬 Movie Suggestion ({label})")
+    identity = (most_common_genre, sorted(taste.items()) if taste else None)
+    suggestion = get_analysis(cache_key).get("suggestion") if cache_key else None
+    if suggestion and suggestion[0] == identity:
+        _, result, posters = suggestion
+    else:
+        result = recommend(recommender, most_common_genre, taste)
+        print("FOUNDED GENRE: " + str(most_common_genre))
+        print("DEBUG_ML: \n" + str(result))
+        posters = get_posters_for_results(result)
+        # Model hazır olmadan verilen popülerlik önerileri oturumda saklanmaz
+        if cache_key and recommender.ready:
+            store_analysis(cache_key, suggestion=(identity, result, posters))
+    if not recommender.ready:
+        st.caption("⏳ The recommendation model is warming up, showing popular movies for now.")
+    with st.container(height=500, border=True):
+        for i, row in result.iterrows():
+            with st.container():
+                col1, col2 = st.columns([1, 3])
+                with col1:
+                    poster_url = posters.get(row['title'])
+                    if poster_url and poster_url != "N/A":
+                        st.image(poster_url, use_container_width=True)
+                    else:
+                        st.image("image/Netflix_icon.svg", use_container_width=True)
+                with col2:
+                    st.markdown(f"### {row['title']}")
+                    st.markdown(f"- ⭐ IMDb: {row['vote_average']}")
+                    if not pd.isna(row.get("emotion_score")):
+                        st.markdown(f"- 🎭 Emotion Score: {row['emotion_score']}")
+                        st.markdown(f"- 🧠 Final Score: {row['final_score']:.2f}")
+                st.markdown("---")
+
+
+def render_timings(placeholder, recorder):
+    # Bu yeniden çalıştırmanın süre dökümü; kümülatif metrikler Prometheus metni olarak indirilebilir
+    with placeholder.container():
+        with st.expander(f"⏱️ Timings ({recorder.elapsed_ms():.0f} ms this run)"):
+            summary = recorder.summary()
+            if summary:
+                st.dataframe(pd.DataFrame(summary), hide_index=True, use_container_width=True)
+                st.dataframe(pd.DataFrame(recorder.spans), hide_index=True, use_container_width=True)
+            else:
+                st.info("No instrumented work in this run.")
+            if recorder.counters:
+                counters_df = pd.DataFrame(
+                    [(name, ", ".join(f"{k}={v}" for k, v in labels), value)
+                     for (name, labels), value in sorted(recorder.counters.items())],
+                    columns=["counter", "labels", "value"],
+                )
+                st.dataframe(counters_df, hide_index=True, use_container_width=True)
+            st.download_button(
+                "Download Prometheus metrics",
+                telemetry.export_prometheus(),
+                file_name="music2movie.prom",
+                mime="text/plain",
+            )
+
+
+def render_memory_report(engine):
+    # Süreç başına tek motor: memory-map sayfaları işçiler arasında paylaşılır, geri kalanı sürece özel
+    report = pd.DataFrame(engine.memory_report())
+    if report.empty:
+        return
+    private_mb = report.loc[~report["memory_mapped"], "bytes"].sum() / 2**20
+    mapped_mb = report.loc[report["memory_mapped"], "bytes"].sum() / 2**20
+    with st.expander(f"🧮 Engine memory ({private_mb:.1f} MB private, {mapped_mb:.1f} MB memory-mapped)"):
+        if not engine.ready:
+            st.caption("Showing the catalog-only engine while the model warms up.")
+        report["MB"] = report.pop("bytes") / 2**20
+        st.dataframe(report.sort_values("MB", ascending=False), hide_index=True, use_container_width=True)
+
+
+def render_profiler(placeholder):
+    # İstek bir sonraki yeniden çalıştırmada (ör. Home'a geçiş) profili başlatır
+    with placeholder.container():
+        with st.expander("🔬 Profiler"):
+            mode = st.radio("Profiler", profiler.MODES, horizontal=True, key="profile_mode")
+            st.caption("cProfile traces the script thread; sampling also covers thread pool workers.")
+            if st.session_state.get("profile_request"):
+                st.info(f"{st.session_state.profile_request} will capture your next interaction.")
+            elif st.button("Profile next rerun", key="profile_next"):
+                st.session_state.profile_request = mode
+                st.info(f"{mode} will capture your next interaction.")
+
+            last_profile = st.session_state.get("last_profile")
+            if last_profile:
+                st.markdown(f"**Last profile:** {last_profile['mode']}, {last_profile['duration_ms']:.0f} ms")
+                st.caption(f"{last_profile['pstats']}  \n{last_profile['collapsed']}")
+                st.dataframe(pd.DataFrame(last_profile["top"]), hide_index=True, use_container_width=True)
+                if os.path.exists(last_profile["collapsed"]):
+                    with open(last_profile["collapsed"], encoding="utf-8") as f:
+                        st.download_button(
+                            "Download collapsed stacks",
+                            f.read(),
+                            file_name=os.path.basename(last_profile["collapsed"]),
+                            mime="text/plain",
+                        )
+
+
 def home_page(queue_data):
 
     selected = option_menu(
@@ -50,6 +206,8 @@ def home_page(queue_data):
 
     if selected == "Queue Songs":
         if "queue" in queue_data:
+            # Şarkılar hemen çizilir, türler sanatçı grupları çözüldükçe doldurulur
+            track_placeholders = []
             with main_col:
                 st.markdown("### 🎶 Queue Songs")
                 with st.container(height=500, border=True):
@@ -57,17 +215,7 @@ def home_page(queue_data):
                         for track in queue_data["queue"]:
                             song_name = track["name"]
                             album_image = track["album"]["images"][0]["url"]
-                            artist_list = track["artists"]
-                            artist_ids = [artist["id"] for artist in artist_list]
-                            artist_count = len(artist_ids)
-
-                            all_genres = []
-                            for artist_id in artist_ids:
-                                genres = get_artist_genres(artist_id, access_token)
-                                all_genres.extend(genres)
-                                genre_counts.update(genres)
-
-                            all_genres = list(set(all_genres)) or ["(No genres)"]
+                            artist_count = len(track["artists"])
 
                             with st.container():
                                 cols = st.columns([1, 3])
@@ -76,75 +224,72 @@ def home_page(queue_data):
                                 with cols[1]:
                                     st.markdown(f"### 🎵 {song_name}")
                                     st.markdown(f"👥 **Number of Artist:** {artist_count}")
-                                    st.markdown(f"🎼 **Genres:** {', '.join(all_genres)}")
+                                    genre_placeholder = st.empty()
+                                    genre_placeholder.markdown("🎼 **Genres:** ⏳")
                             st.divider()
+                            track_placeholders.append((track, genre_placeholder))
                     else:
                         st.error("There are no songs in your Spotify queue at the moment.")
 
-                    if genre_counts:
-                        most_common_genre = genre_counts.most_common(1)[0][0]
-                    else:
-                        most_common_genre = "NotValid"
-
             with movie_col:
-                st.markdown(f"### 🎬 Movie Suggestion ({most_common_genre})")
-                result = recommender.recommend_varied_films(most_common_genre)
-                print("FOUNDED GENRE: " + str(most_common_genre))
-                print("DEBUG_ML: \n" + str(result))
-                with st.container(height=500, border=True):
-                    for i, row in result.iterrows():
-                        with st.container():
-                            col1, col2 = st.columns([1, 3])
-                            with col1:
-                                poster_url = get_poster_url_by_title(row['title'])
-                                if poster_url and poster_url != "N/A":
-                                    st.image(poster_url, use_container_width=True)
-                                else:
-                                    st.image("image/Netflix_icon.svg", use_container_width=True)
-                            with col2:
-                                st.markdown(f"### {row['title']}")
-                                st.markdown(f"- ⭐ IMDb: {row['vote_average']}")
-                                if not pd.isna(row.get("emotion_score")):
-                                    st.markdown(f"- 🎭 Emotion Score: {row['emotion_score']}")
-                                    st.markdown(f"- 🧠 Final Score: {row['final_score']:.2f}")
-                            st.markdown("---")
+                suggestion_placeholder = st.empty()
+
+            # Öneri geçici en yaygın türle hemen gösterilir, tür değiştikçe yenilenir.
+            # Kuyruk içeriği değişmediyse oturumdaki analiz kullanılır.
+            analysis_key = queue_key(queue_data)
+            analysis = get_analysis(analysis_key)
+            if "genre_counts" in analysis:
+                stages = [(analysis["artist_genres"], analysis["genre_counts"])]
+            else:
+                stages = iter_queue_genres(queue_data, access_token)
+
+            most_common_genre = None
+            rendered_counts = None
+            for artist_genres, partial_counts in stages:
+                pending = []
+                for track, genre_placeholder in track_placeholders:
+                    if all(artist_id in artist_genres for artist_id in track_artist_ids(track)):
+                        all_genres = track_genres(track, artist_genres) or ["(No genres)"]
+                        genre_placeholder.markdown(f"🎼 **Genres:** {', '.join(all_genres)}")
+                    else:
+                        pending.append((track, genre_placeholder))
+                track_placeholders = pending
+
+                if partial_counts and top_genre(partial_counts) != most_common_genre:
+                    most_common_genre = top_genre(partial_counts)
+                    rendered_counts = dict(partial_counts)
+                    with suggestion_placeholder.container():
+                        render_movie_suggestion(most_common_genre, analysis_key, partial_counts)
+
+            for track, genre_placeholder in track_placeholders:
+                genre_placeholder.markdown("🎼 **Genres:** ⚠️ could not be loaded")
+            if queue_resolved(queue_data, artist_genres):
+                store_analysis(analysis_key, artist_genres=artist_genres, genre_counts=partial_counts)
+            genre_counts.update(partial_counts)
+            if most_common_genre is None:
+                with suggestion_placeholder.container():
+                    render_movie_suggestion(top_genre(genre_counts), analysis_key)
+            elif taste_mode() and rendered_counts != partial_counts:
+                # Tüm dağılım puanlandığında son hali bir kez daha çizilir
+                with suggestion_placeholder.container():
+                    render_movie_suggestion(most_common_genre, analysis_key, partial_counts)
 
     if selected == "Playlists":
         analyzer = PlaylistAnalyzer(access_token)
-        all_playlists = analyzer.get_all_playlists()
-
-        if all_playlists:
-            top_playlists = analyzer.get_top_playlists(all_playlists)
-
-            if not top_playlists:
-                st.error("No playlist with enough songs was found.")
-            else:
-                genres, playlist_summaries = analyzer.analyze_genres_from_playlists(top_playlists)
-                genre_counts.update(genres)
-
-                st.session_state.top_playlists = top_playlists
-                st.session_state.genres = genres
-                st.session_state.playlist_summaries = playlist_summaries
-                st.session_state.genre_counts = genre_counts
-
-                most_common_genre = genre_counts.most_common(1)[0][0]
-                st.markdown(f"🎧 Founded Genre: **{most_common_genre}**")
+        all_playlists, top_playlists = load_top_playlists(analyzer)
 
-            if not top_playlists:
-                st.session_state.top_playlists = []
-                st.session_state.genres = {}
-                st.session_state.playlist_summaries = []
-                st.session_state.genre_counts = Counter()
-        else:
-            most_common_genre = "NotValid"
+        if all_playlists and not top_playlists:
+            st.error("No playlist with enough songs was found.")
+        founded_placeholder = st.empty()
 
+        # Playlist listesi analiz beklenmeden, liste yanıtındaki bilgilerle çizilir
         with main_col:
             st.markdown("### 🎼 Playlists")
             with st.container(height=500, border=True):
                 if not all_playlists:
                     st.error("🎵 You don’t have any playlists to analyze.")
                 else:
-                    for playlist in playlist_summaries:
+                    for playlist in map(playlist_summary, top_playlists):
                         name = playlist["name"]
                         image = playlist["image"]
                         track_count = playlist["track_count"]
@@ -158,27 +303,42 @@ def home_page(queue_data):
                                 st.markdown(f"🎵 **Number of Songs:** {track_count}")
                         st.divider()
         with movie_col:
-            st.markdown(f"### 🎬 Movie Suggestion ({most_common_genre})")
-            result = recommender.recommend_varied_films(most_common_genre)
-            print("FOUNDED GENRE: " + str(most_common_genre))
-            print("DEBUG_ML: \n" + str(result))
-            with st.container(height=500, border=True):
-                for i, row in result.iterrows():
-                    with st.container():
-                        col1, col2 = st.columns([1, 3])
-                        with col1:
-                            poster_url = get_poster_url_by_title(row['title'])
-                            if poster_url and poster_url != "N/A":
-                                st.image(poster_url, use_container_width=True)
-                            else:
-                                st.image("image/Netflix_icon.svg", use_container_width=True)
-                        with col2:
-                            st.markdown(f"### {row['title']}")
-                            st.markdown(f"- ⭐ IMDb: {row['vote_average']}")
-                            if not pd.isna(row.get("emotion_score")):
-                                st.markdown(f"- 🎭 Emotion Score: {row['emotion_score']}")
-                                st.markdown(f"- 🧠 Final Score: {row['final_score']:.2f}")
-                        st.markdown("---")
+            suggestion_placeholder = st.empty()
+
+        most_common_genre = None
+        rendered_counts = None
+        genres, playlist_summaries = Counter(), []
+        analysis_key = playlists_key(top_playlists)
+        if top_playlists:
+            analysis = get_analysis(analysis_key)
+            if "genre_counts" in analysis:
+                stages = [(analysis["genre_counts"], analysis["playlist_summaries"])]
+            else:
+                stages = analyzer.iter_genres_from_playlists(top_playlists)
+
+            for genres, playlist_summaries in stages:
+                if genres and top_genre(genres) != most_common_genre:
+                    most_common_genre = top_genre(genres)
+                    rendered_counts = dict(genres)
+                    founded_placeholder.markdown(f"🎧 Founded Genre: **{most_common_genre}**")
+                    with suggestion_placeholder.container():
+                        render_movie_suggestion(most_common_genre, analysis_key, genres)
+            if most_common_genre is not None and taste_mode() and rendered_counts != genres:
+                with suggestion_placeholder.container():
+                    render_movie_suggestion(most_common_genre, analysis_key, genres)
+            if not analyzer.incomplete:
+                store_analysis(analysis_key, genre_counts=genres, playlist_summaries=playlist_summaries)
+            genre_counts.update(genres)
+
+        if all_playlists:
+            st.session_state.top_playlists = top_playlists
+            st.session_state.genres = genres
+            st.session_state.playlist_summaries = playlist_summaries
+            st.session_state.genre_counts = genre_counts
+
+        if most_common_genre is None:
+            with suggestion_placeholder.container():
+                render_movie_suggestion("NotValid", analysis_key)
 
 
 def developer_mode(queue_data):
@@ -207,20 +367,14 @@ def developer_mode(queue_data):
 
                 with st.container(height=500, border=True):
                     if queue_data.get("queue"):
+                        analysis = queue_analysis(queue_data)
+                        artist_genres = analysis["artist_genres"]
+                        genre_counts.update(analysis["genre_counts"])
                         for track in queue_data["queue"]:
                             song_name = track["name"]
                             album_image = track["album"]["images"][0]["url"]
-                            artist_list = track["artists"]
-                            artist_ids = [artist["id"] for artist in artist_list]
-                            artist_count = len(artist_ids)
-
-                            all_genres = []
-                            for artist_id in artist_ids:
-                                genres = get_artist_genres(artist_id, access_token=access_token)
-                                all_genres.extend(genres)
-                                genre_counts.update(genres)
-
-                            all_genres = list(set(all_genres)) or ["(No genres)"]
+                            artist_count = len(track["artists"])
+                            all_genres = track_genres(track, artist_genres) or ["(No genres)"]
 
                             with st.container():
                                 cols = st.columns([1, 3])
@@ -254,13 +408,12 @@ def developer_mode(queue_data):
 
     if selected == "Playlists":
         analyzer = PlaylistAnalyzer(access_token)
-        all_playlists = analyzer.get_all_playlists()
+        all_playlists, top_playlists = load_top_playlists(analyzer)
 
         if all_playlists:
-            top_playlists = analyzer.get_top_playlists(all_playlists)
-
             if top_playlists:
-                genres, playlist_summaries = analyzer.analyze_genres_from_playlists(top_playlists)
+                analysis = playlist_analysis(analyzer, top_playlists)
+                genres, playlist_summaries = analysis["genre_counts"], analysis["playlist_summaries"]
                 genre_counts.update(genres)
 
                 st.session_state.top_playlists = top_playlists
@@ -321,6 +474,19 @@ def developer_mode(queue_data):
 # Sayfa ayarı
 st.set_page_config(layout="wide")
 
+# Model indirme/yükleme arka planda, giriş sayfası gösterilirken başlar
+start_engine_warmup()
+
+# Profil yalnızca Developer mode'dan istendiğinde açılır; yarıda kesilmiş bir önceki profil önce kapatılır
+profile_session = st.session_state.pop("profile_session", None)
+if profile_session is not None:
+    st.session_state.last_profile = profile_session.stop()
+    profile_session = None
+if st.session_state.get("profile_request"):
+    profile_session = profiler.start(st.session_state.pop("profile_request"))
+    st.session_state.profile_session = profile_session
+profiler_placeholder = None
+
 # Sayfa başlığı
 # st.title("🎵 Music to Movie")
 # st.write("Hoş geldin! Spotify'daki müzik zevkine göre sana film önereceğiz.")
@@ -334,6 +500,12 @@ if "access_token" not in st.session_state:
 if "queue_data" not in st.session_state:
     st.session_state.queue_data = None
 
+if "all_playlists" not in st.session_state:
+    st.session_state.all_playlists = None
+
+if "scoring_mode" not in st.session_state:
+    st.session_state.scoring_mode = SCORING_MODES[0]
+
 if "code" in query_params and st.session_state.access_token is None:
     code = query_params["code"]
     token_response = get_access_token(code, redirect_uri=REDIRECT_URI)
@@ -347,20 +519,19 @@ if st.session_state.access_token:
     user_name = "Kullanıcı"
     user_image = None
 
-    recommender = Recommender()
+    recommender = get_recommender()
 
-    headers = {"Authorization": f"Bearer {access_token}"}
+    # get_user_profile önbellekli, yeniden çalıştırmalarda ağ çağrısı yapmaz
     try:
-        response = requests.get("https://api.spotify.com/v1/me", headers=headers)
-        if response.status_code == 200:
-            user_data = response.json()
+        user_data = get_user_profile(access_token)
+        if user_data:
             user_name = user_data.get("display_name", "Kullanıcı")
             user_image = user_data.get("images", [{}])[0].get("url")
     except:
         pass
 
     # Sidebar tasarımı
-    with st.sidebar:
+    with st.sidebar, telemetry.span("render", section="sidebar"):
         st.markdown(
             f"""
                     <div 
@@ -459,6 +630,7 @@ if st.session_state.access_token:
 
         if st.button("Refresh"):
             st.session_state.queue_data = get_user_queue(access_token)
+            st.session_state.all_playlists = None
 
 
     # Sayfa açıldığında ilk kez çekilecek veri
@@ -471,11 +643,17 @@ if st.session_state.access_token:
     if selected == "Home":
         st.title("🎧 Home Page")
         st.write("Welcome to the movie recommendation system based on your Spotify music taste!")
-        home_page(queue_data)
+        with telemetry.span("render", section="home"):
+            home_page(queue_data)
 
     elif selected == "Analytics":
         st.title("📊 Analytics")
-        developer_mode(st.session_state.queue_data)
+        timings_placeholder = st.empty()
+        profiler_placeholder = st.empty()
+        with telemetry.span("render", section="analytics"):
+            developer_mode(st.session_state.queue_data)
+        render_timings(timings_placeholder, recorder)
+        render_memory_report(recommender)
 
     elif selected == "Settings":
         st.title("⚙️ Settings")
@@ -508,15 +686,34 @@ if st.session_state.access_token:
 
             st.divider()
 
+            # --- Öneri kipi ---
+            st.subheader("🎯 Recommendation Mode")
+            st.radio(
+                "Score movies by",
+                SCORING_MODES,
+                index=SCORING_MODES.index(st.session_state.scoring_mode),
+                key="scoring_mode_choice",
+                horizontal=True,
+                help="Whole taste scores your full weighted genre mix instead of only the most common genre.",
+                on_change=lambda: st.session_state.update(scoring_mode=st.session_state.scoring_mode_choice),
+            )
+
+            st.divider()
+
             # --- Veri Yönetimi (Butonlar hizalı) ---
             st.subheader("🔁 Data Management")
 
             if st.button("🧹 Clear Cache", key="clear"):
+                # st.cache_data (profil), kalıcı sanatçı/afiş/playlist önbellekleri ve oturumun analizleri
                 st.cache_data.clear()
+                for store in (artist_cache, poster_cache, playlist_cache):
+                    store.clear()
+                clear_analyses()
                 st.success("Cache cleared!")
 
             if st.button("🔄 Reanalyze", key="reanalyze"):
                 st.info("New analyze started...")
+                clear_analyses()
                 st.session_state.queue_data = get_user_queue(access_token)
 
             if st.button("🔒Log out", help="logout", key="logout"):
@@ -580,9 +777,43 @@ else:
         "🎬 Turning your playlists into plot twists..."
     ]
 
-    placeholder = st.empty()
-    for i in range(100):
-        message = login_messages[i % len(login_messages)]
-        placeholder.markdown(f"<div style='text-align: center; font-size: 20px;'>{message}</div>",
-                             unsafe_allow_html=True)
-        time.sleep(5)
+    # Mesajlar tarayıcıda CSS animasyonuyla döner; betik beklemeden hemen biter
+    message_seconds = 5
+    cycle_seconds = message_seconds * len(login_messages)
+    visible_percent = 100 / len(login_messages)
+    message_divs = "".join(
+        f"<div style='animation-delay: {i * message_seconds}s;'>{message}</div>"
+        for i, message in enumerate(login_messages)
+    )
+    st.markdown(f"""
+        <style>
+        .login-messages {{
+            position: relative;
+            height: 40px;
+            text-align: center;
+            font-size: 20px;
+        }}
+        .login-messages div {{
+            position: absolute;
+            width: 100%;
+            opacity: 0;
+            animation: login-message-rotate {cycle_seconds}s infinite;
+        }}
+        @keyframes login-message-rotate {{
+            0% {{ opacity: 0; }}
+            {visible_percent * 0.1:.2f}% {{ opacity: 1; }}
+            {visible_percent * 0.9:.2f}% {{ opacity: 1; }}
+            {visible_percent:.2f}% {{ opacity: 0; }}
+            100% {{ opacity: 0; }}
+        }}
+        </style>
+        <div class="login-messages">{message_divs}</div>
+    """, unsafe_allow_html=True)
+
+if profile_session is not None:
+    st.session_state.pop("profile_session", None)
+    st.session_state.last_profile = profile_session.stop()
+if profiler_placeholder is not None:
+    render_profiler(profiler_placeholder)
+
+telemetry.export_from_env()
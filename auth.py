@@ -1,5 +1,5 @@
 import streamlit as st
-import requests
+import http_client
 import base64
 import os
 from dotenv import load_dotenv
@@ -8,9 +8,10 @@ load_dotenv()
 
 CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID") or st.secrets.get("SPOTIFY_CLIENT_ID")
 CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET") or st.secrets.get("SPOTIFY_CLIENT_SECRET")
+TOKEN_URL = os.getenv("SPOTIFY_TOKEN_URL", "https://accounts.spotify.com/api/token")
 
 def get_access_token(code, redirect_uri):
-    url = "https://accounts.spotify.com/api/token"
+    url = TOKEN_URL
     auth_str = f"{CLIENT_ID}:{CLIENT_SECRET}"
     b64_auth_str = base64.b64encode(auth_str.encode()).decode()
 
@@ -25,5 +26,5 @@ def get_access_token(code, redirect_uri):
         "Content-Type": "application/x-www-form-urlencoded",
     }
 
-    response = requests.post(url, data=data, headers=headers)
+    response = http_client.post(url, data=data, headers=headers)
     return response.json()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Arayüzsüz toplu öneri: kaydedilmiş kuyruk/playlist JSON'ları (get_user_queue ve PlaylistAnalyzer
+# çıktılarıyla aynı biçimde) bir süreç havuzunda tür çözümü ve Recommender puanlamasından geçer,
+# sonuçlar girişle aynı sırada JSONL olarak yazılır. Kullanıcı kimliği dosya adıdır.
+# Örnek: python batch.py --input saved_queues/ --output recommendations.jsonl --workers 4
+_engine = None
+_options = None
+
+
+def payload_paths(input_dir):
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.endswith(".json") and os.path.isfile(os.path.join(input_dir, name))
+    )
+
+
+def user_seed(seed, user):
+    # Aynı seed ile her kullanıcının seçimi, işçi sayısı ve sıradan bağımsız olarak tekrarlanır
+    if seed is None:
+        return None
+    return (seed + zlib.crc32(user.encode("utf-8"))) % 2**32
+
+
+def _records(result):
+    # NaN JSON'da geçerli değil
+    return result.astype(object).where(result.notna(), None).to_dict("records")
+
+
+def _init_worker(model_path, data_path, poster_index_path, options):
+    # İşçi başına bir motor; katalog ve indeks memory-map olduğundan sayfalar işçiler arasında paylaşılır
+    global _engine, _options
+    from analytic import Recommender
+
+    _engine = Recommender(model_path, data_path, poster_index_path)
+    _options = options
+    if options["access_token"] and options["spotify_rate"]:
+        from spotify_async import set_rate
+
+        set_rate(options["spotify_rate"], options["spotify_burst"])
+
+
+def process_payload(path):
+    from pipeline import count_genres, payload_artist_occurrences, recommend, resolve_artist_genres, top_genre
+
+    user = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        kind, occurrences = payload_artist_occurrences(payload)
+        artist_genres = resolve_artist_genres(list(occurrences), _options["access_token"])
+        genre_counts = count_genres(occurrences, artist_genres)
+        genre = top_genre(genre_counts)
+        taste = genre_counts if _options["whole_taste"] else None
+        result = recommend(_engine, genre, taste, top_n=_options["top_n"], seed=user_seed(_options["seed"], user))
+    except Exception as e:
+        return {"user": user, "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "user": user,
+        "source": kind,
+        "top_genre": genre,
+        "genre_counts": dict(genre_counts.most_common()),
+        "unresolved_artists": sum(1 for artist_id in occurrences if artist_id not in artist_genres),
+        "model_ready": _engine.ready,
+        "recommendations": _records(result),
+    }
+
+
+def run_batch(input_dir, output_path, workers=None, whole_taste=False, top_n=3, seed=None, access_token=None,
+              model_path=None, data_path=None, poster_index_path=None, chunksize=8):
+    from analytic import DATA_PATH, MODEL_PATH, Recommender
+    from poster_index import POSTER_INDEX_PATH
+    from spotify_async import BURST, RATE
+
+    model_path = model_path or MODEL_PATH
+    data_path = data_path or DATA_PATH
+    poster_index_path = poster_index_path or POSTER_INDEX_PATH
+    workers = workers or os.cpu_count() or 1
+    paths = payload_paths(input_dir)
+
+    # Model indirme, katalog dönüşümü ve indeks kurulumu bir kez burada yapılır;
+    # işçiler yalnızca diskteki hazır dosyaları açar
+    started = time.time()
+    Recommender(model_path, data_path, poster_index_path)
+    options = {
+        "whole_taste": whole_taste,
+        "top_n": top_n,
+        "seed": seed,
+        "access_token": access_token,
+        # Spotify limiti süreç başına değil uygulama geneli: işçilere bölünür
+        "spotify_rate": RATE / workers,
+        "spotify_burst": max(1.0, BURST / workers),
+    }
+
+    users = failed = 0
+    first = None
+    # spawn: ana süreçteki iş parçacıkları (olay döngüsü, SQLite bağlantıları) işçilere kopyalanmaz
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(model_path, data_path, poster_index_path, options)) as executor:
+        ready = time.time()
+        with open(output_path, "w", encoding="utf-8") as out:
+            for record in executor.map(process_payload, paths, chunksize=chunksize):
+                first = first or time.time()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                users += 1
+                failed += "error" in record
+    finished = time.time()
+
+    # Süre işçi süreçlerinin açılışını da içerir; ilk sonuca kadar geçen süre ayrıca raporlanır
+    elapsed = finished - ready
+    stats = {
+        "users": users,
+        "failed": failed,
+        "workers": workers,
+        "setup_s": ready - started,
+        "startup_s": (first or finished) - ready,
+        "elapsed_s": elapsed,
+        "users_per_s": users / elapsed if elapsed else 0.0,
+    }
+    print(f"{users} users ({failed} failed) in {elapsed:.2f}s with {workers} workers: "
+          f"{stats['users_per_s']:.1f} users/s (setup {stats['setup_s']:.1f}s, "
+          f"first result after {stats['startup_s']:.1f}s) -> {output_path}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute movie recommendations for saved queue/playlist payloads.")
+    parser.add_argument("--input", required=True, help="directory of *.json payloads, one user per file")
+    parser.add_argument("--output", default="recommendations.jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the CPU count")
+    parser.add_argument("--mode", choices=["top-genre", "whole-taste"], default="top-genre")
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=None, help="makes each user's draw reproducible")
+    parser.add_argument("--token", default=os.getenv("SPOTIFY_ACCESS_TOKEN"),
+                        help="Spotify token for artists missing from the artist cache")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--catalog", default=None)
+    parser.add_argument("--posters", default=None)
+    parser.add_argument("--chunksize", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        whole_taste=args.mode == "whole-taste",
+        top_n=args.top_n,
+        seed=args.seed,
+        access_token=args.token,
+        model_path=args.model,
+        data_path=args.catalog,
+        poster_index_path=args.posters,
+        chunksize=args.chunksize,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Uygulama modülleri ortam değişkenlerini import sırasında okur; bu yüzden sahte sunucu
+# ve geçici önbellek yolları, uygulama modülleri import edilmeden önce ayarlanır.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.standin import SPOTIFY_GENRES, StandinServer, make_fixtures  # noqa: E402
+
+MOVIE_GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama", "Family", "Fantasy",
+    "History", "Horror", "Music", "Mystery", "Romance", "Science Fiction", "Thriller", "War", "Western",
+]
+QUERY_GENRES = ["pop", "turkish trap", "dark clubbing", "rock", "indie", "soundtrack", "NotValid"]
+BASELINE_PATH = os.path.join(ROOT, "bench", "baseline.json")
+
+
+def make_catalog(size, data_dir, seed=0):
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    genres = (rng.random((size, len(MOVIE_GENRES))) < 0.2).astype(int)
+    emotion = genres @ rng.normal(0, 3, len(MOVIE_GENRES)) + rng.normal(0, 1, size)
+
+    features = pd.DataFrame(genres, columns=MOVIE_GENRES)
+    train = slice(0, min(size, 5000))
+    model = RandomForestRegressor(n_estimators=20, max_depth=6, random_state=seed)
+    model.fit(features.iloc[train], emotion[train])
+
+    catalog = features.copy()
+    catalog.insert(0, "title", [f"Movie {i}" for i in range(size)])
+    catalog["genre_group"] = ["|".join(g for g, v in zip(MOVIE_GENRES, row) if v) or "Other" for row in genres]
+    catalog["emotion_score"] = emotion
+    catalog["vote_average"] = rng.uniform(1, 10, size).round(1)
+    catalog["final_popularity"] = rng.uniform(0, 100, size)
+    catalog["final_score"] = rng.uniform(0, 10, size)
+    catalog["overview"] = "A stand-in overview used to give rows a realistic width."
+
+    model_path = os.path.join(data_dir, "emotion_score_model.pkl")
+    data_path = os.path.join(data_dir, "movie_df_ml.csv")
+    catalog.to_csv(data_path, index=False, encoding="ISO-8859-1")
+    joblib.dump(model, model_path)
+    return model_path, data_path
+
+
+def measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+        "min_ms": times[0] * 1000,
+        "runs": len(times),
+    }
+
+
+def bench_recommender(results, sizes, repeat, workdir):
+    from analytic import Recommender
+
+    for size in sizes:
+        model_path, data_path = make_catalog(size, os.path.join(workdir, f"catalog-{size}"))
+        no_index = os.path.join(workdir, "missing-poster-index.json")
+        results[f"recommender.load[{size}]"] = measure(
+            lambda: Recommender(model_path, data_path, no_index), max(1, repeat // 10))
+
+        engine = Recommender(model_path, data_path, no_index)
+        queries = iter(QUERY_GENRES * repeat * 10)
+        results[f"recommender.recommend_varied_films[{size}]"] = measure(
+            lambda: engine.recommend_varied_films(next(queries)), repeat * 10)
+
+        # Onlarca türlük bir kullanıcı dağılımı
+        taste = {genre: len(SPOTIFY_GENRES) - i for i, genre in enumerate(SPOTIFY_GENRES)}
+        results[f"recommender.recommend_for_taste[{size}]"] = measure(
+            lambda: engine.recommend_for_taste(taste), repeat * 10)
+
+        query = engine.movie_vector(["pop", "rock"], emotion_score=2.0, vote_average=7.5)
+        for approximate in (False, True):
+            name = "approx" if approximate else "exact"
+            results[f"recommender.nearest_movies.{name}[{size}]"] = measure(
+                lambda: engine.nearest_movies(query, 10, approximate=approximate), repeat * 10)
+
+
+def clear_stores():
+    from playlist_analysis import playlist_cache
+    from spotify_api import artist_cache
+    from imdb_movie_poster import poster_cache
+
+    for store in (artist_cache, playlist_cache, poster_cache):
+        store.clear()
+
+
+def bench_playlists(results, server, sizes, repeat):
+    from playlist_analysis import PlaylistAnalyzer
+
+    for size in sizes:
+        server.state.fixtures = make_fixtures(tracks_per_playlist=size, artists=max(50, size))
+        analyzer = PlaylistAnalyzer("standin-token")
+        top = analyzer.get_top_playlists(analyzer.get_all_playlists())
+
+        results[f"playlists.analyze.cold[{size}]"] = measure(
+            lambda: analyzer.analyze_genres_from_playlists(top), repeat, setup=clear_stores)
+        results[f"playlists.analyze.sequential[{size}]"] = measure(
+            lambda: analyzer.analyze_genres_from_playlists(top, concurrent=False), repeat, setup=clear_stores)
+        results[f"playlists.analyze.warm[{size}]"] = measure(
+            lambda: analyzer.analyze_genres_from_playlists(top), repeat)
+
+
+def bench_concurrent_users(results, server, users, repeat, rate_limit):
+    # Aynı anda analiz yapan kullanıcılar; sahte sunucu uygulama geneli hız sınırı uygular
+    from concurrent.futures import ThreadPoolExecutor
+    from playlist_analysis import PlaylistAnalyzer
+
+    server.state.fixtures = make_fixtures(tracks_per_playlist=300, artists=600)
+    analyzer = PlaylistAnalyzer("standin-token")
+    top = analyzer.get_top_playlists(analyzer.get_all_playlists())
+    previous = server.state.rate_limit
+    server.state.rate_limit, server.state.burst = rate_limit, rate_limit
+    try:
+        for count in users:
+            def run_users():
+                with ThreadPoolExecutor(max_workers=count) as executor:
+                    list(executor.map(lambda _: PlaylistAnalyzer("standin-token").analyze_genres_from_playlists(top),
+                                      range(count)))
+
+            throttled = server.state.requests["429"]
+            result = measure(run_users, repeat, setup=clear_stores)
+            result["users_per_s"] = count * 1000 / result["median_ms"]
+            result["429_per_run"] = (server.state.requests["429"] - throttled) / repeat
+            results[f"playlists.concurrent_users[{count}]"] = result
+    finally:
+        server.state.rate_limit = previous
+
+
+def bench_batch(results, server, users, workers, workdir):
+    # Kaydedilmiş kuyruklar üzerinde arayüzsüz toplu çalıştırma; işçi süreçlerinin açılışı dahil
+    import random
+    from batch import run_batch
+
+    model_path, data_path = make_catalog(10000, os.path.join(workdir, "batch-catalog"))
+    fixtures = server.state.fixtures = make_fixtures(tracks_per_playlist=300, artists=2000)
+    tracks = [track for playlist in fixtures["playlists"] for track in playlist["tracks"]]
+    input_dir = os.path.join(workdir, "batch-input")
+    os.makedirs(input_dir, exist_ok=True)
+    rng = random.Random(0)
+    for i in range(users):
+        with open(os.path.join(input_dir, f"user{i:05d}.json"), "w", encoding="utf-8") as f:
+            json.dump({"currently_playing": None, "queue": rng.sample(tracks, 20)}, f)
+
+    for count in workers:
+        for name, setup in (("cold", clear_stores), ("warm", None)):
+            stats = {}
+
+            def run():
+                stats.update(run_batch(input_dir, os.path.join(workdir, "batch.jsonl"), workers=count, seed=0,
+                                       access_token="standin-token", model_path=model_path, data_path=data_path,
+                                       poster_index_path=os.path.join(workdir, "missing-poster-index.json")))
+
+            result = measure(run, 1, setup=setup)
+            result["users_per_s"] = stats["users_per_s"]
+            results[f"batch.{name}[{users}x{count}]"] = result
+
+
+def select_tabs(*choices):
+    # streamlit_option_menu bir tarayıcı bileşeni; AppTest içinde seçimi sabitlemek için değiştirilir
+    import streamlit_option_menu
+
+    def option_menu(menu_title, options, **kwargs):
+        for choice in choices:
+            if choice in options:
+                return choice
+        return options[kwargs.get("default_index", 0)]
+
+    streamlit_option_menu.option_menu = option_menu
+
+
+def render_page(logged_in=True):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    if logged_in:
+        app.session_state["access_token"] = "standin-token"
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return app
+
+
+def bench_pages(results, server, sizes, repeat, workdir):
+    model_path, data_path = make_catalog(5000, os.path.join(workdir, "DATA"))
+    link = os.path.join(workdir, "image")
+    if not os.path.exists(link):
+        os.symlink(os.path.join(ROOT, "image"), link)
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from analytic import get_recommender
+        get_recommender()
+
+        results["page.landing"] = measure(lambda: render_page(logged_in=False), repeat)
+
+        for size in sizes:
+            server.state.fixtures = make_fixtures(tracks_per_playlist=size, artists=max(50, size))
+            select_tabs("Home", "Queue Songs")
+            results[f"page.home.queue[{size}]"] = measure(render_page, repeat, setup=clear_stores)
+            select_tabs("Home", "Playlists")
+            results[f"page.home.playlists[{size}]"] = measure(render_page, repeat, setup=clear_stores)
+            select_tabs("Analytics", "Playlists")
+            results[f"page.analytics.playlists[{size}]"] = measure(render_page, repeat, setup=clear_stores)
+    finally:
+        os.chdir(previous)
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    regressions = []
+    compared = 0
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            continue
+        compared += 1
+        delta = result["median_ms"] - base["median_ms"]
+        if delta > min_delta_ms and result["median_ms"] > base["median_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: {base['median_ms']:.2f}ms -> {result['median_ms']:.2f}ms")
+    if results and not compared:
+        # Boyutlar veya senaryolar taban çizgisiyle örtüşmüyorsa hiçbir şey karşılaştırılmamış demektir
+        regressions.append("no benchmark matched the baseline; rerun with the sizes it was saved with")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmarks against the local stand-in.")
+    parser.add_argument("--catalog-sizes", default="1000,10000,100000")
+    parser.add_argument("--playlist-sizes", default="100,1000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in latency per request (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--only", choices=["recommender", "playlists", "users", "pages", "batch"], action="append")
+    parser.add_argument("--users", default="1,8,32", help="concurrent users for the rate-limited scenario")
+    parser.add_argument("--standin-rate-limit", type=float, default=50.0,
+                        help="stand-in requests/s before 429 in the concurrent-users scenario")
+    parser.add_argument("--batch-users", type=int, default=500, help="saved queues in the batch scenario")
+    parser.add_argument("--batch-workers", default="1,2", help="process pool sizes for the batch scenario")
+    parser.add_argument("--landing-budget-ms", type=float, default=2000,
+                        help="the logged-out page must render within this budget")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--no-baseline", action="store_true",
+                        help="only check the landing-page budget; skip the baseline comparison")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+    if not (args.save_baseline or args.no_baseline or os.path.exists(args.baseline)):
+        # Taban çizgisi makineye özgü; sessizce karşılaştırmasız koşmak yerine açıkça hata ver
+        parser.error(f"baseline {args.baseline} not found; create it on this machine with --save-baseline "
+                     "or pass --no-baseline")
+
+    catalog_sizes = [int(size) for size in args.catalog_sizes.split(",") if size]
+    playlist_sizes = [int(size) for size in args.playlist_sizes.split(",") if size]
+    users = [int(count) for count in args.users.split(",") if count]
+    batch_workers = [int(count) for count in args.batch_workers.split(",") if count]
+    suites = args.only or ["recommender", "playlists", "users", "pages", "batch"]
+
+    workdir = tempfile.mkdtemp(prefix="music2movie-bench-")
+    server = StandinServer(latency=args.latency, error_rate=args.error_rate, retry_after="0.05").start()
+    os.environ.update(server.env())
+    os.environ.update({
+        "SPOTIFY_CLIENT_ID": os.getenv("SPOTIFY_CLIENT_ID", "standin"),
+        "SPOTIFY_CLIENT_SECRET": os.getenv("SPOTIFY_CLIENT_SECRET", "standin"),
+        "OMDB_API_KEY": os.getenv("OMDB_API_KEY", "standin"),
+        "ARTIST_CACHE_PATH": os.path.join(workdir, "cache.sqlite"),
+        "POSTER_CACHE_PATH": os.path.join(workdir, "cache.sqlite"),
+        "PLAYLIST_CACHE_PATH": os.path.join(workdir, "cache.sqlite"),
+    })
+
+    results = {}
+    try:
+        if "recommender" in suites:
+            bench_recommender(results, catalog_sizes, args.repeat, workdir)
+        if "playlists" in suites:
+            bench_playlists(results, server, playlist_sizes, args.repeat)
+        if "users" in suites:
+            bench_concurrent_users(results, server, users, args.repeat, args.standin_rate_limit)
+        if "pages" in suites:
+            bench_pages(results, server, playlist_sizes, args.repeat, workdir)
+        if "batch" in suites:
+            bench_batch(results, server, args.batch_users, batch_workers, workdir)
+    finally:
+        server.stop()
+
+    for name, result in sorted(results.items()):
+        extra = "".join(f"   {key} {result[key]:.1f}" for key in ("users_per_s", "429_per_run") if key in result)
+        print(f"{name:50s} median {result['median_ms']:10.2f} ms   p95 {result['p95_ms']:10.2f} ms{extra}")
+    print(f"stand-in requests: {dict(server.state.requests)}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    failures = []
+    landing = results.get("page.landing")
+    if landing and landing["p95_ms"] > args.landing_budget_ms:
+        failures.append(f"page.landing p95 {landing['p95_ms']:.0f}ms exceeds budget {args.landing_budget_ms:.0f}ms")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+    elif not args.no_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures.extend(compare(results, json.load(f), args.tolerance, args.min_delta_ms))
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+# Spotify ve OMDb için yerel, fixture tabanlı sahte sunucu.
+# Uygulamanın kullandığı uç noktalar: /v1/me, /v1/me/player/queue, /v1/me/playlists,
+# /v1/playlists/{id}, /v1/playlists/{id}/tracks, /v1/artists/{id}, /v1/artists?ids=,
+# /api/token ve OMDb ?t=. Gecikme, 429 enjeksiyonu ve sayfalama ayarlanabilir.
+
+SPOTIFY_GENRES = [
+    "pop", "dance pop", "turkish pop", "turkish trap", "turkish rock", "dark clubbing", "rock",
+    "alt rock", "indie", "indie pop", "hip hop", "rap", "trap", "drill", "edm", "house", "techno",
+    "metal", "metalcore", "punk", "folk", "country", "soul", "r&b", "jazz", "blues", "classical",
+    "soundtrack", "lofi", "ambient", "k-pop", "anime", "synthwave", "arabesk", "reggae",
+]
+PAGE_LIMIT = 100
+
+
+def make_fixtures(queue_size=20, playlists=5, tracks_per_playlist=200, artists=300,
+                  genres_per_artist=2, poster_miss_rate=0.1, seed=0):
+    rng = random.Random(seed)
+    artist_map = {}
+    for i in range(artists):
+        artist_id = f"artist{i:06d}"
+        artist_map[artist_id] = {
+            "id": artist_id,
+            "name": f"Artist {i}",
+            "genres": rng.sample(SPOTIFY_GENRES, rng.randint(0, genres_per_artist)),
+        }
+    artist_ids = list(artist_map)
+
+    def track(i):
+        return {
+            "id": f"track{i:07d}",
+            "name": f"Song {i}",
+            "album": {"images": [{"url": f"https://images.local/album{i % 97}.jpg"}]},
+            "artists": [{"id": artist_id, "name": artist_map[artist_id]["name"]}
+                        for artist_id in rng.sample(artist_ids, rng.randint(1, 3))],
+        }
+
+    playlist_list = []
+    counter = 0
+    for p in range(playlists):
+        size = max(1, tracks_per_playlist - p * (tracks_per_playlist // (playlists * 2) if playlists else 0))
+        tracks = [track(counter + i) for i in range(size)]
+        counter += size
+        playlist_list.append({
+            "id": f"playlist{p:04d}",
+            "name": f"Playlist {p}",
+            "snapshot_id": f"snap{p}-{seed}",
+            "images": [{"url": f"https://images.local/playlist{p}.jpg"}],
+            "tracks": tracks,
+        })
+
+    return {
+        "user": {
+            "id": "standin-user",
+            "display_name": "Stand-in User",
+            "email": "standin@example.com",
+            "product": "premium",
+            "country": "tr",
+            "followers": {"total": 42},
+            "images": [{"url": "https://images.local/user.jpg"}],
+        },
+        "queue": [track(counter + i) for i in range(queue_size)],
+        "playlists": playlist_list,
+        "artists": artist_map,
+        "poster_miss_rate": poster_miss_rate,
+    }
+
+
+class StandinState:
+    def __init__(self, fixtures, latency=0.0, jitter=0.0, error_rate=0.0, retry_after=1, seed=0, rate_limit=0.0,
+                 burst=None):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        # rate_limit > 0: Spotify gibi uygulama geneli token bucket, aşılınca 429 + Retry-After
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1.0, rate_limit)
+        self.requests = Counter()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    def _over_limit(self):
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+            throttled = (self.error_rate and self._rng.random() < self.error_rate) or self._over_limit()
+        if self.latency or jitter:
+            time.sleep(self.latency + jitter)
+        return throttled
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _base(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def _page(self, items, offset, limit, path):
+        stop = offset + limit
+        next_url = f"{self._base()}{path}?offset={stop}&limit={limit}" if stop < len(items) else None
+        return {
+            "items": items[offset:stop],
+            "total": len(items),
+            "limit": limit,
+            "offset": offset,
+            "next": next_url,
+        }
+
+    def _throttle(self, endpoint):
+        self.state.count(endpoint)
+        if self.state.delay():
+            self.state.count("429")
+            self._send(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                       {"Retry-After": str(self.state.retry_after)})
+            return True
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if urlsplit(self.path).path != "/api/token":
+            return self._send(404, {"error": "not found"})
+        if self._throttle("token"):
+            return
+        self._send(200, {
+            "access_token": "standin-token",
+            "token_type": "Bearer",
+            "expires_in": 3600,
+            "scope": "user-read-email user-read-private user-read-playback-state user-top-read",
+        })
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        fixtures = self.state.fixtures
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", PAGE_LIMIT))
+
+        if path in ("", "/omdb"):
+            if self._throttle("omdb"):
+                return
+            title = query.get("t", "")
+            if (sum(map(ord, title)) % 100) < fixtures.get("poster_miss_rate", 0) * 100:
+                return self._send(200, {"Response": "False", "Error": "Movie not found!"})
+            return self._send(200, {"Title": title, "Poster": f"https://posters.local/{quote(title)}.jpg",
+                                    "Response": "True"})
+
+        if path == "/v1/me":
+            if self._throttle("me"):
+                return
+            return self._send(200, fixtures["user"])
+
+        if path == "/v1/me/player/queue":
+            if self._throttle("queue"):
+                return
+            return self._send(200, {"currently_playing": None, "queue": fixtures["queue"]})
+
+        if path == "/v1/me/playlists":
+            if self._throttle("playlists"):
+                return
+            items = [
+                {key: value for key, value in playlist.items() if key != "tracks"}
+                | {"tracks": {"total": len(playlist["tracks"])}}
+                for playlist in fixtures["playlists"]
+            ]
+            return self._send(200, self._page(items, offset, min(limit, 50), path))
+
+        if path.startswith("/v1/playlists/"):
+            rest = path[len("/v1/playlists/"):]
+            playlist_id, _, sub = rest.partition("/")
+            playlist = next((p for p in fixtures["playlists"] if p["id"] == playlist_id), None)
+            if playlist is None:
+                self.state.count("playlist")
+                return self._send(404, {"error": {"status": 404, "message": "Not found."}})
+            items = [{"track": track} for track in playlist["tracks"]]
+            if sub == "tracks":
+                if self._throttle("playlist_tracks"):
+                    return
+                return self._send(200, self._page(items, offset, limit, path))
+            if self._throttle("playlist"):
+                return
+            details = {key: value for key, value in playlist.items() if key != "tracks"}
+            details["tracks"] = self._page(items, 0, PAGE_LIMIT, f"{path}/tracks")
+            return self._send(200, details)
+
+        if path == "/v1/artists":
+            if self._throttle("artists"):
+                return
+            ids = [artist_id for artist_id in query.get("ids", "").split(",") if artist_id]
+            if len(ids) > 50:
+                return self._send(400, {"error": {"status": 400, "message": "Too many ids requested"}})
+            return self._send(200, {"artists": [fixtures["artists"].get(artist_id) for artist_id in ids]})
+
+        if path.startswith("/v1/artists/"):
+            if self._throttle("artist"):
+                return
+            artist = fixtures["artists"].get(path.rsplit("/", 1)[1])
+            if artist is None:
+                return self._send(404, {"error": {"status": 404, "message": "Not found."}})
+            return self._send(200, artist)
+
+        self._send(404, {"error": "not found"})
+
+
+class StandinServer:
+    def __init__(self, fixtures=None, host="127.0.0.1", port=0, **options):
+        self.state = StandinState(fixtures or make_fixtures(), **options)
+        handler = type("BoundStandinHandler", (StandinHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        # Uygulama modüllerini bu sunucuya yönlendiren ortam değişkenleri
+        return {
+            "SPOTIFY_API_URL": f"{self.url}/v1",
+            "SPOTIFY_TOKEN_URL": f"{self.url}/api/token",
+            "OMDB_URL": f"{self.url}/omdb/",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Spotify/OMDb stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="JSON fixture file (default: generated)")
+    parser.add_argument("--dump-fixtures", help="write the generated fixtures to this file and exit")
+    parser.add_argument("--queue-size", type=int, default=20)
+    parser.add_argument("--playlists", type=int, default=5)
+    parser.add_argument("--tracks-per-playlist", type=int, default=200)
+    parser.add_argument("--artists", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", default="1")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before answering 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            fixtures = json.load(f)
+    else:
+        fixtures = make_fixtures(args.queue_size, args.playlists, args.tracks_per_playlist, args.artists,
+                                 seed=args.seed)
+    if args.dump_fixtures:
+        with open(args.dump_fixtures, "w", encoding="utf-8") as f:
+            json.dump(fixtures, f)
+        return
+
+    server = StandinServer(fixtures, args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, retry_after=args.retry_after, seed=args.seed,
+                           rate_limit=args.rate_limit)
+    print(f"Stand-in listening on {server.url}")
+    for key, value in server.env().items():
+        print(f"export {key}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import telemetry
+
+
+class CacheStore:
+    # SQLite üzerinde kalıcı anahtar/değer önbelleği, önünde boyutu sınırlı bir bellek LRU'su.
+    # WAL kipi sayesinde aynı dosyayı tüm oturumlar ve worker süreçleri paylaşabilir.
+    def __init__(self, path, table, ttl, memory_size=10000):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        with telemetry.span("cache.get", cache=self.table):
+            found, requested = self._get_many(keys)
+        telemetry.count("cache_lookups", len(found), cache=self.table, result="hit")
+        telemetry.count("cache_lookups", requested - len(found), cache=self.table, result="miss")
+        return found
+
+    def _get_many(self, keys):
+        now = time.time()
+        found = {}
+        missing = []
+        keys = dict.fromkeys(keys)
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry and entry[1] > now:
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                else:
+                    missing.append(key)
+
+        # SQLite'ın değişken sınırına takılmamak için parça parça sorgula
+        for start in range(0, len(missing), 500):
+            batch = missing[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._connection().execute(
+                f"SELECT key, value, expires_at FROM {self.table} "
+                f"WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*batch, now),
+            ).fetchall()
+            for key, value, expires_at in rows:
+                value = json.loads(value)
+                found[key] = value
+                self._remember(key, value, expires_at)
+
+        return found, len(keys)
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def put_many(self, mapping, ttl=None):
+        if not mapping:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        conn = self._connection()
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+            [(key, json.dumps(value), expires_at) for key, value in mapping.items()],
+        )
+        conn.commit()
+        for key, value in mapping.items():
+            self._remember(key, value, expires_at)
+
+    def put(self, key, value, ttl=None):
+        self.put_many({key: value}, ttl=ttl)
+
+    def purge_expired(self):
+        conn = self._connection()
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        conn = self._connection()
+        conn.execute(f"DELETE FROM {self.table}")
+        conn.commit()
+
+
+class MemoryCache:
+    # Süreç içi, boyutu ve yaşı sınırlı LRU; JSON'a çevrilemeyen değerler (dizi, DataFrame) için
+    def __init__(self, name, max_size, ttl):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                value = entry[0]
+            else:
+                self._entries.pop(key, None)
+                value = default
+        telemetry.count("cache_lookups", cache=self.name, result="miss" if value is default else "hit")
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
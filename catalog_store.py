@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Film kataloğunun sütunlu ikili biçimi. CSV bir kez ayrıştırılır (ISO-8859-1, bozuk satırlar
+# atlanır, emotion_score sayıya çevrilir); sayısal sütunlar küçültülmüş tiplerle (float32, en küçük
+# tamsayı) .npy dosyalarına, metin sütunları kod dizisi + UTF-8 metin tablosu olarak yazılır.
+# Açılışta yalnızca istenen sütunlar okunur; sayısal sütunlar memory-map edilir, metin sütunları
+# kategorik olur. CSV ayrıştırması yapılmaz ve sayfalar işçi süreçleri arasında paylaşılır.
+CATALOG_DIR = os.path.join("DATA", "catalog")
+DATA_PATH = os.path.join("DATA", "movie_df_ml.csv")
+STORE_VERSION = 2
+
+# Aynı süreçte ısınma iş parçacığı ile betik iş parçacığı aynı anda dönüştürmeye kalkabilir
+_convert_lock = threading.Lock()
+
+
+def read_catalog_csv(path):
+    movie_df = pd.read_csv(path, encoding="ISO-8859-1", on_bad_lines="skip")
+    movie_df["emotion_score"] = pd.to_numeric(movie_df["emotion_score"], errors="coerce")
+    return movie_df
+
+
+def compact_column(series):
+    # Skorlar için float32 yeterli; 0/1 tür sütunları int8'e iner
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy()
+    if pd.api.types.is_float_dtype(series):
+        return series.to_numpy(dtype=np.float32)
+    return pd.to_numeric(series, downcast="integer").to_numpy()
+
+
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _save_array(path, array):
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _encode_strings(values):
+    # Tekrarlanan değerler bir kez saklanır; -1 eksik değer. Karışık tipli sütunlar önce metne çevrilir.
+    values = pd.Series(values, dtype=object)
+    values = values.mask(values.notna(), values.astype(str))
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    strings = list(uniques)
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(s) for s in strings])
+    text = np.frombuffer("".join(strings).encode("utf-8"), dtype=np.uint8)
+    return codes.astype(np.int32), text, offsets
+
+
+def _decode_strings(text, offsets):
+    # offsets karakter cinsinden: tablo tek seferde çözülüp dilimlenir
+    joined = bytes(text).decode("utf-8")
+    return [joined[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def save_catalog(movie_df, directory=CATALOG_DIR, source=None):
+    os.makedirs(directory, exist_ok=True)
+    # meta.json en son yazılır; yarım kalan bir dönüşüm bir sonraki açılışta yeniden yapılır
+    meta_path = os.path.join(directory, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    columns = []
+    for i, name in enumerate(movie_df.columns):
+        series = movie_df[name]
+        base = os.path.join(directory, f"{i:04d}")
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            _save_array(f"{base}.npy", compact_column(series))
+            columns.append({"name": str(name), "kind": "numeric"})
+        else:
+            codes, text, offsets = _encode_strings(series)
+            _save_array(f"{base}.codes.npy", codes)
+            _save_array(f"{base}.text.npy", text)
+            _save_array(f"{base}.offsets.npy", offsets)
+            columns.append({"name": str(name), "kind": "string"})
+
+    meta = {"version": STORE_VERSION, "rows": len(movie_df), "source": source, "columns": columns}
+    tmp_path = _tmp_path(meta_path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+    return meta
+
+
+def _categorical(codes, categories):
+    return pd.Categorical.from_codes(codes, categories=pd.Index(categories))
+
+
+def select_columns(movie_df, columns=None):
+    # CSV'den doğrudan okunan çerçeveyi deponun döndürdüğü biçime getirir
+    if columns is not None:
+        movie_df = movie_df[[column for column in columns if column in movie_df]]
+    data = {}
+    for name in movie_df.columns:
+        series = movie_df[name]
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            data[name] = compact_column(series)
+        else:
+            codes, text, offsets = _encode_strings(series)
+            data[name] = _categorical(codes, _decode_strings(text, offsets))
+    return pd.DataFrame(data, copy=False)
+
+
+def load_catalog(directory=CATALOG_DIR, mmap=True, columns=None):
+    with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported catalog store version: {meta.get('version')}")
+
+    mode = "r" if mmap else None
+    positions = {column["name"]: i for i, column in enumerate(meta["columns"])}
+    wanted = positions if columns is None else [name for name in columns if name in positions]
+    data = {}
+    for name in wanted:
+        base = os.path.join(directory, f"{positions[name]:04d}")
+        if meta["columns"][positions[name]]["kind"] == "numeric":
+            data[name] = np.load(f"{base}.npy", mmap_mode=mode)
+        else:
+            strings = _decode_strings(np.load(f"{base}.text.npy"), np.load(f"{base}.offsets.npy"))
+            data[name] = _categorical(np.load(f"{base}.codes.npy"), strings)
+
+    # copy=False: sayısal sütunlar memory-map olarak kalır
+    movie_df = pd.DataFrame(data, index=pd.RangeIndex(meta["rows"]), copy=False)
+    if len(movie_df) != meta["rows"]:
+        raise ValueError("Catalog store row count mismatch")
+    return movie_df, meta
+
+
+def _load_current(directory, signature, columns):
+    try:
+        movie_df, meta = load_catalog(directory, columns=columns)
+        if signature is None or meta.get("source") == list(signature):
+            return movie_df, meta
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def load_or_convert(csv_path=DATA_PATH, signature=None, directory=CATALOG_DIR, columns=None):
+    # CSV değişmediyse (veya dağıtımda hiç yoksa) ikili katalog okunur; aksi halde bir kez dönüştürülür
+    loaded = _load_current(directory, signature, columns)
+    if loaded is not None:
+        return loaded
+
+    with _convert_lock:
+        # Kilidi beklerken başka bir iş parçacığı dönüştürmeyi bitirmiş olabilir
+        loaded = _load_current(directory, signature, columns)
+        if loaded is not None:
+            return loaded
+        return _convert(csv_path, signature, directory, columns)
+
+
+def _convert(csv_path, signature, directory, columns):
+    movie_df = read_catalog_csv(csv_path)
+    try:
+        save_catalog(movie_df, directory, list(signature) if signature else None)
+        return load_catalog(directory, columns=columns)
+    except OSError as e:
+        print(f"Catalog store could not be saved: {e}")
+    return select_columns(movie_df, columns), {"version": STORE_VERSION, "rows": len(movie_df),
+                                                "source": list(signature or ())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the movie catalog CSV to the memory-mapped columnar store.")
+    parser.add_argument("--catalog", default=DATA_PATH)
+    parser.add_argument("--output", default=None, help="defaults to a 'catalog' directory next to the CSV")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(os.path.dirname(args.catalog), "catalog")
+    started = time.time()
+    movie_df = read_catalog_csv(args.catalog)
+    stat = os.stat(args.catalog)
+    meta = save_catalog(movie_df, output, [stat.st_mtime_ns, stat.st_size])
+    print(f"{meta['rows']} rows, {len(meta['columns'])} columns in {time.time() - started:.1f}s -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import re
+from functools import lru_cache
+
+# Spotify'ın mikro türlerindeki kelimeleri modelin bilebileceği genel türlere bağlar.
+# Hedefler model sütunlarına çözümlenir; modelde karşılığı olmayanlar yok sayılır.
+GENRE_ALIASES = {
+    "trap": ["hip hop", "rap", "crime"],
+    "drill": ["hip hop", "rap", "crime"],
+    "rap": ["hip hop", "crime"],
+    "hip": ["hip hop", "rap", "crime"],
+    "hop": ["hip hop", "rap", "crime"],
+    "pop": ["pop", "music", "romance", "comedy"],
+    "rock": ["rock", "action"],
+    "electronic": ["electronic", "science fiction"],
+    "grime": ["hip hop", "crime"],
+    "phonk": ["hip hop", "action"],
+    "clubbing": ["dance", "edm", "electronic"],
+    "club": ["dance", "edm", "electronic"],
+    "house": ["dance", "electronic"],
+    "techno": ["electronic", "dance"],
+    "trance": ["electronic", "dance"],
+    "edm": ["electronic", "dance"],
+    "dubstep": ["electronic", "action"],
+    "disco": ["dance", "music"],
+    "dark": ["thriller", "horror"],
+    "metal": ["metal", "rock", "horror", "action"],
+    "metalcore": ["metal", "rock", "action"],
+    "punk": ["rock", "action"],
+    "grunge": ["rock", "drama"],
+    "emo": ["rock", "drama"],
+    "indie": ["indie", "drama"],
+    "folk": ["folk", "drama", "history"],
+    "country": ["country", "western"],
+    "americana": ["country", "western"],
+    "soul": ["soul", "r&b", "romance"],
+    "rnb": ["r&b", "romance"],
+    "ballad": ["romance", "drama"],
+    "romantic": ["romance"],
+    "love": ["romance"],
+    "sad": ["drama"],
+    "chill": ["chill", "drama"],
+    "lofi": ["chill", "animation"],
+    "ambient": ["ambient", "documentary", "science fiction"],
+    "soundtrack": ["soundtrack", "music", "fantasy"],
+    "anime": ["animation", "fantasy"],
+    "kids": ["family", "animation"],
+    "children": ["family", "animation"],
+    "christmas": ["family"],
+    "classical": ["classical", "history", "drama"],
+    "jazz": ["jazz", "music", "drama"],
+    "blues": ["blues", "drama"],
+    "reggae": ["reggae", "comedy"],
+    "comedy": ["comedy"],
+    "arabesk": ["drama"],
+    "psychedelic": ["fantasy", "science fiction"],
+    "synthwave": ["science fiction", "electronic"],
+    "cyberpunk": ["science fiction", "action"],
+    "war": ["war", "history"],
+}
+
+
+def normalize_genre(genre):
+    return " ".join(re.findall(r"[a-z0-9&]+", genre.lower().replace("-", " ")))
+
+
+def _tokens(text):
+    words = text.split()
+    bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words + bigrams
+
+
+class GenreIndex:
+    def __init__(self, feature_names, aliases=GENRE_ALIASES, cache_size=4096):
+        self.feature_names = list(feature_names)
+        self._order = {col: i for i, col in enumerate(self.feature_names)}
+
+        # Sütun adlarının tüm alt dizeleri -> sütunlar (eski "keyword in col" kuralı)
+        self._substrings = {}
+        # Sütun adlarındaki kelime ve kelime ikilileri -> sütunlar
+        self._tokens = {}
+        for col in self.feature_names:
+            name = normalize_genre(col)
+            for start in range(len(name)):
+                for stop in range(start + 1, len(name) + 1):
+                    self._substrings.setdefault(name[start:stop], set()).add(col)
+            for token in _tokens(name):
+                self._tokens.setdefault(token, set()).add(col)
+
+        # Takma adlar bir kez çözümlenip saklanır
+        self._aliases = {}
+        for token, targets in aliases.items():
+            columns = set()
+            for target in targets:
+                columns.update(self._direct_match(normalize_genre(target)))
+            if columns:
+                self._aliases[token] = columns
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _sorted(self, columns):
+        return tuple(sorted(columns, key=self._order.__getitem__))
+
+    def _direct_match(self, name):
+        if not name:
+            return set()
+        columns = self._substrings.get(name)
+        if columns:
+            return set(columns)
+        matched = set()
+        for token in _tokens(name):
+            matched.update(self._tokens.get(token, ()))
+        return matched
+
+    def _resolve(self, genre):
+        name = normalize_genre(genre)
+        matched = self._direct_match(name)
+        if matched:
+            return self._sorted(matched)
+
+        for token in _tokens(name):
+            matched.update(self._aliases.get(token, ()))
+        return self._sorted(matched)
+
+    def cache_info(self):
+        return self.resolve.cache_info()
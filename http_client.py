@@ -0,0 +1,119 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import telemetry
+
+# Tüm dış HTTP çağrıları buradan geçer: host başına havuzlanmış (keep-alive) oturum,
+# zaman aşımı, üstel geri çekilme ile yeniden deneme ve Retry-After desteği.
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", 30))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 32))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Bu yöntemler tekrarlanınca sonuç değişmez; diğerleri (ör. tek kullanımlık kodla POST) sadece
+# istek sunucuya hiç ulaşmadıysa yeniden denenir
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions[key] = session
+    return session
+
+
+def retry_after_seconds(response):
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt, response=None):
+    delay = retry_after_seconds(response)
+    if delay is None:
+        delay = BACKOFF_FACTOR * (2 ** attempt) * random.uniform(0.5, 1.0)
+    return delay
+
+
+def is_connect_error(error):
+    # Bağlantı kurulamadıysa istek gönderilmemiştir; okuma zaman aşımı veya kopan bağlantı ise
+    # sunucunun isteği işlemiş olabileceği anlamına gelir
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def request(method, url, timeout=None, max_retries=None, **kwargs):
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    retries = MAX_RETRIES if max_retries is None else max_retries
+    session = get_session(url)
+
+    host = urlsplit(url).netloc
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    for attempt in range(retries + 1):
+        try:
+            with telemetry.span("http", method=method, host=host) as labels:
+                try:
+                    response = session.request(method, url, timeout=timeout, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    labels["status"] = type(e).__name__
+                    raise
+                labels["status"] = response.status_code
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == retries or not (idempotent or is_connect_error(e)):
+                raise
+            telemetry.count("http_retries", method=method, host=host)
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt == retries or not idempotent:
+            return response
+
+        delay = backoff_delay(attempt, response)
+        if delay > MAX_RETRY_AFTER:
+            # Çok uzun bekleme istenirse betik iş parçacığını bloklamak yerine yanıtı döndür
+            return response
+        print(f"HTTP {response.status_code} from {host}, retrying in {delay:.2f}s")
+        telemetry.count("http_retries", method=method, host=host)
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -1,11 +1,71 @@
 import streamlit as st
-import requests
+import http_client
+import telemetry
 import os
+from concurrent.futures import ThreadPoolExecutor
+from cache_store import CacheStore
 
 OMDB_API_KEY = os.getenv("OMDB_API_KEY") or st.secrets.get("OMDB_API_KEY")
+OMDB_URL = os.getenv("OMDB_URL", "https://www.omdbapi.com/")
+POSTER_MISS = "N/A"
 
-def get_poster_url_by_title(title):
-    url = f"http://www.omdbapi.com/?t={title}&apikey={OMDB_API_KEY}"
-    response = requests.get(url)
+# Bulunamayan afişler ("N/A") de saklanır ama daha kısa süre
+poster_cache = CacheStore(
+    os.getenv("POSTER_CACHE_PATH", os.path.join("DATA", "cache.sqlite")),
+    table="posters",
+    ttl=float(os.getenv("POSTER_CACHE_TTL", 30 * 24 * 3600)),
+    memory_size=int(os.getenv("POSTER_CACHE_MEMORY_SIZE", 5000)),
+)
+POSTER_MISS_TTL = float(os.getenv("POSTER_MISS_TTL", 24 * 3600))
+
+
+def fetch_poster_url(title, omdb_url=None):
+    response = http_client.get(omdb_url or OMDB_URL, params={"t": title, "apikey": OMDB_API_KEY})
+    if response.status_code != 200:
+        print(f"OMDb poster fetch error: {response.status_code} - {title}")
+        return None
     data = response.json()
-    return data.get("Poster", None)
+    return data.get("Poster") or POSTER_MISS
+
+
+def _fetch_poster_safely(title):
+    try:
+        return fetch_poster_url(title)
+    except Exception as e:
+        print(f"OMDb poster fetch error: {e} - {title}")
+        return None
+
+
+def get_posters_by_titles(titles, max_workers=8):
+    unique_titles = list(dict.fromkeys(title for title in titles if title))
+    posters = poster_cache.get_many(unique_titles)
+    missing = [title for title in unique_titles if title not in posters]
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            fetched = dict(zip(missing, executor.map(telemetry.propagate(_fetch_poster_safely), missing)))
+
+        # Geçici hatalar (None) önbelleğe yazılmaz
+        poster_cache.put_many({t: url for t, url in fetched.items() if url and url != POSTER_MISS})
+        poster_cache.put_many({t: url for t, url in fetched.items() if url == POSTER_MISS}, ttl=POSTER_MISS_TTL)
+        posters.update(fetched)
+
+    return posters
+
+
+def get_poster_url_by_title(title):
+    return get_posters_by_titles([title]).get(title)
+
+
+def get_posters_for_results(result):
+    # Önceden oluşturulmuş afiş indeksinden gelen URL'ler kullanılır, sadece eksikler OMDb'ye gider
+    posters = {}
+    if "poster_url" in result:
+        posters = {
+            title: url for title, url in zip(result["title"], result["poster_url"])
+            if isinstance(url, str) and url
+        }
+    missing = [title for title in result["title"] if title not in posters]
+    if missing:
+        posters.update(get_posters_by_titles(missing))
+    return posters
@@ -0,0 +1,196 @@
+import json
+import os
+
+import numpy as np
+
+# Katalog için en yakın komşu indeksi. Özellik uzayı: tür one-hot'ları + standartlaştırılmış
+# emotion_score, vote_average ve log(popülerlik). Vektörler küme sırasıyla .npy dosyalarına
+# yazılır ve açılışta memory-map ile okunur; kesin arama bloklar halinde, yaklaşık arama
+# yalnızca sorguya en yakın kümelerde (IVF) yapılır.
+MOVIE_INDEX_DIR = os.path.join("DATA", "movie_index")
+INDEX_VERSION = 1
+NUMERIC_WEIGHTS = {"emotion_score": 1.0, "vote_average": 0.5, "final_popularity": 0.5}
+BLOCK_SIZE = 65536
+ARRAYS = ("vectors", "norms", "ids", "offsets", "centroids")
+
+
+def numeric_features(movie_df):
+    values = {}
+    for column in NUMERIC_WEIGHTS:
+        if column in movie_df:
+            values[column] = np.asarray(movie_df[column], dtype=np.float64)
+        else:
+            values[column] = np.full(len(movie_df), np.nan)
+    values["final_popularity"] = np.log1p(np.clip(values["final_popularity"], 0, None))
+    return values
+
+
+def feature_scaling(movie_df):
+    scaling = {}
+    for column, values in numeric_features(movie_df).items():
+        mean = float(np.nanmean(values)) if np.isfinite(values).any() else 0.0
+        std = float(np.nanstd(values)) if np.isfinite(values).any() else 0.0
+        scaling[column] = [mean, std or 1.0]
+    return scaling
+
+
+def build_features(genre_matrix, movie_df, scaling):
+    columns = [genre_matrix.astype(np.float32)]
+    for column, values in numeric_features(movie_df).items():
+        mean, std = scaling[column]
+        # Eksik değerler ortalamaya (0) çekilir
+        scaled = np.nan_to_num((values - mean) / std, nan=0.0, posinf=0.0, neginf=0.0)
+        columns.append((scaled * NUMERIC_WEIGHTS[column]).astype(np.float32)[:, None])
+    return np.ascontiguousarray(np.hstack(columns))
+
+
+def scale_query(genre_vector, numeric, scaling):
+    # numeric: {"emotion_score": ..., "vote_average": ..., "final_popularity": ...}; eksikler ortalama
+    query = [np.asarray(genre_vector, dtype=np.float32)]
+    for column, weight in NUMERIC_WEIGHTS.items():
+        value = numeric.get(column)
+        if value is None or np.isnan(value):
+            query.append(np.zeros(1, dtype=np.float32))
+            continue
+        if column == "final_popularity":
+            value = np.log1p(max(value, 0))
+        mean, std = scaling[column]
+        query.append(np.array([(value - mean) / std * weight], dtype=np.float32))
+    return np.concatenate(query)
+
+
+def _squared_distances(vectors, norms, query):
+    return norms - 2.0 * (vectors @ query) + float(query @ query)
+
+
+def _smallest(distances, k):
+    if len(distances) <= k:
+        return np.argsort(distances, kind="stable")
+    top = np.argpartition(distances, k - 1)[:k]
+    return top[np.argsort(distances[top], kind="stable")]
+
+
+def kmeans(vectors, clusters, iterations=8, sample_size=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        for c in range(clusters):
+            members = sample[labels == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+    return centroids
+
+
+def assign(vectors, centroids):
+    centroid_norms = (centroids * centroids).sum(axis=1)
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), BLOCK_SIZE):
+        block = vectors[start:start + BLOCK_SIZE]
+        labels[start:start + BLOCK_SIZE] = np.argmin(centroid_norms - 2.0 * (block @ centroids.T), axis=1)
+    return labels
+
+
+class MovieIndex:
+    def __init__(self, vectors, norms, ids, offsets, centroids, meta):
+        self.vectors = vectors
+        self.norms = norms
+        self.ids = ids
+        self.offsets = offsets
+        self.centroids = centroids
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, features, meta, clusters=None, seed=0):
+        features = np.asarray(features, dtype=np.float32)
+        clusters = clusters or max(1, min(len(features), int(np.sqrt(len(features)))))
+        if len(features) == 0:
+            centroids = np.zeros((0, features.shape[1]), dtype=np.float32)
+            labels = np.zeros(0, dtype=np.int64)
+        else:
+            centroids = kmeans(features, clusters, seed=seed)
+            labels = assign(features, centroids)
+
+        # Aynı kümedeki satırlar bitişik saklanır: küme c = vectors[offsets[c]:offsets[c + 1]]
+        ids = np.argsort(labels, kind="stable")
+        vectors = np.ascontiguousarray(features[ids])
+        offsets = np.searchsorted(labels[ids], np.arange(len(centroids) + 1))
+        norms = (vectors * vectors).sum(axis=1)
+        meta = dict(meta, version=INDEX_VERSION, rows=len(features), dims=features.shape[1])
+        return cls(vectors, norms, ids, offsets, centroids, meta)
+
+    def save(self, directory=MOVIE_INDEX_DIR):
+        os.makedirs(directory, exist_ok=True)
+        # meta.json en son yazılır; yarım kalan bir yazım bir sonraki açılışta yeniden inşa tetikler
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name in ARRAYS:
+            path = os.path.join(directory, f"{name}.npy")
+            with open(f"{path}.tmp", "wb") as f:
+                np.save(f, getattr(self, name))
+            os.replace(f"{path}.tmp", path)
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    @classmethod
+    def load(cls, directory=MOVIE_INDEX_DIR, mmap=True):
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in ARRAYS]
+        return cls(*arrays, meta)
+
+    def search(self, query, k=10, approximate=False, nprobe=8):
+        # (katalog satır indeksleri, öklid uzaklıkları), yakından uzağa
+        query = np.asarray(query, dtype=np.float32)
+        if k <= 0 or len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if approximate and len(self.centroids) > nprobe:
+            rows, distances = self._search_clusters(query, k, nprobe)
+        else:
+            rows, distances = self._search_blocks(query, k)
+        return self.ids[rows], np.sqrt(np.maximum(distances, 0))
+
+    def _search_blocks(self, query, k):
+        rows, distances = [], []
+        for start in range(0, len(self), BLOCK_SIZE):
+            stop = start + BLOCK_SIZE
+            block = _squared_distances(self.vectors[start:stop], self.norms[start:stop], query)
+            top = _smallest(block, k)
+            rows.append(top + start)
+            distances.append(block[top])
+        rows, distances = np.concatenate(rows), np.concatenate(distances)
+        top = _smallest(distances, k)
+        return rows[top], distances[top]
+
+    def _search_clusters(self, query, k, nprobe):
+        probes = _smallest(_squared_distances(self.centroids, (self.centroids ** 2).sum(axis=1), query), nprobe)
+        rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes])
+        distances = _squared_distances(self.vectors[rows], self.norms[rows], query)
+        top = _smallest(distances, k)
+        return rows[top], distances[top]
+
+
+def load_or_build(genre_matrix, movie_df, signature, directory=MOVIE_INDEX_DIR):
+    # Katalog ve özellik sütunları değişmediyse diskteki indeks memory-map edilir
+    try:
+        index = MovieIndex.load(directory)
+        if index.meta.get("version") == INDEX_VERSION and index.meta.get("signature") == signature:
+            return index
+    except (OSError, ValueError):
+        pass
+
+    scaling = feature_scaling(movie_df)
+    features = build_features(genre_matrix, movie_df, scaling)
+    index = MovieIndex.build(features, {"signature": signature, "scaling": scaling})
+    try:
+        index.save(directory)
+    except OSError as e:
+        print(f"Movie index could not be saved: {e}")
+    return index
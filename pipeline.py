@@ -0,0 +1,108 @@
+from collections import Counter
+from spotify_api import artist_cache, get_artists_genres, iter_artists_genres
+from spotify_async import BACKGROUND
+
+# Arayüzden bağımsız analiz adımları: Streamlit sayfaları ve toplu çalıştırma (batch.py) aynı
+# fonksiyonları kullanır.
+
+
+def queue_tracks(queue_data):
+    return (queue_data or {}).get("queue") or []
+
+
+def track_artist_ids(track):
+    return [artist["id"] for artist in track.get("artists", []) if artist.get("id")]
+
+
+def iter_queue_genres(queue_data, access_token):
+    # Sanatçı grupları çözüldükçe (artist_genres, genre_counts) ara sonuçlarını üretir.
+    # Her tür, sanatçının kuyrukta geçtiği şarkı sayısı kadar sayılır.
+    occurrences = Counter(
+        artist_id for track in queue_tracks(queue_data) for artist_id in track_artist_ids(track)
+    )
+    artist_genres = {}
+    genre_counts = Counter()
+
+    yield artist_genres, genre_counts
+    for resolved in iter_artists_genres(occurrences, access_token):
+        for artist_id, genres in resolved.items():
+            artist_genres[artist_id] = genres
+            for genre in genres:
+                genre_counts[genre] += occurrences[artist_id]
+        yield artist_genres, genre_counts
+
+
+def queue_resolved(queue_data, artist_genres):
+    # Kuyruktaki her sanatçının türleri çözüldü mü; süre aşımı veya başarısız grupta False
+    return all(
+        artist_id in artist_genres for track in queue_tracks(queue_data) for artist_id in track_artist_ids(track)
+    )
+
+
+def analyze_queue_genres(queue_data, access_token):
+    for artist_genres, genre_counts in iter_queue_genres(queue_data, access_token):
+        pass
+    return artist_genres, genre_counts
+
+
+def playlist_artist_ids(playlist):
+    # Playlist detayındaki her şarkı-sanatçı geçişi (tekrarlar dahil)
+    artist_ids = []
+    for item in playlist["tracks"]["items"]:
+        track = item.get("track")
+        if not track:
+            continue
+        for artist in track.get("artists", []):
+            artist_id = artist.get("id")
+            if artist_id:
+                artist_ids.append(artist_id)
+    return artist_ids
+
+
+def payload_artist_occurrences(payload):
+    # get_user_queue yanıtı, tek bir playlist detayı, playlist detayları listesi veya {"playlists": [...]}
+    # -> (tür, sanatçı id -> geçiş sayısı)
+    if isinstance(payload, dict) and "queue" in payload:
+        tracks = queue_tracks(payload)
+        return "queue", Counter(artist_id for track in tracks for artist_id in track_artist_ids(track))
+    if isinstance(payload, dict) and "playlists" in payload:
+        payload = payload["playlists"]
+    playlists = payload if isinstance(payload, list) else [payload]
+    if not all(isinstance(playlist, dict) and "items" in playlist.get("tracks", {}) for playlist in playlists):
+        raise ValueError("Unrecognized payload: expected a queue or playlist details")
+    return "playlists", Counter(artist_id for playlist in playlists for artist_id in playlist_artist_ids(playlist))
+
+
+def resolve_artist_genres(artist_ids, access_token=None, priority=BACKGROUND):
+    # Token yoksa yalnızca kalıcı sanatçı önbelleği kullanılır; bulunamayanlar türsüz kalır
+    if access_token:
+        return get_artists_genres(artist_ids, access_token, priority)
+    return artist_cache.get_many(list(dict.fromkeys(artist_ids)))
+
+
+def count_genres(occurrences, artist_genres):
+    genre_counts = Counter()
+    for artist_id, n in occurrences.items():
+        for genre in artist_genres.get(artist_id, []):
+            genre_counts[genre] += n
+    return genre_counts
+
+
+def recommend(engine, genre, taste=None, top_n=3, seed=None):
+    # taste verilirse ("Whole taste") tek tür yerine tüm ağırlıklı dağılım puanlanır
+    if taste:
+        return engine.recommend_for_taste(dict(taste), top_n=top_n, seed=seed)
+    return engine.recommend_varied_films(genre, top_n=top_n, seed=seed)
+
+
+def track_genres(track, artist_genres):
+    genres = []
+    for artist_id in track_artist_ids(track):
+        genres.extend(artist_genres.get(artist_id, []))
+    return list(dict.fromkeys(genres))
+
+
+def top_genre(genre_counts):
+    if genre_counts:
+        return genre_counts.most_common(1)[0][0]
+    return "NotValid"
@@ -1,68 +1,147 @@
-import requests
-from spotify_api import get_artist_genres
+import os
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from cache_store import CacheStore
+from pipeline import playlist_artist_ids
+from spotify_api import SPOTIFY_API_URL, get_artists_genres
+from spotify_async import INTERACTIVE, SpotifyClient, run
+
+# (playlist_id, snapshot_id) -> {"genres": {...}, "summary": {...}}
+playlist_cache = CacheStore(
+    os.getenv("PLAYLIST_CACHE_PATH", os.path.join("DATA", "cache.sqlite")),
+    table="playlist_analysis",
+    ttl=float(os.getenv("PLAYLIST_CACHE_TTL", 30 * 24 * 3600)),
+    memory_size=int(os.getenv("PLAYLIST_CACHE_MEMORY_SIZE", 2000)),
+)
 
 class PlaylistAnalyzer:
-    def __init__(self, access_token):
+    def __init__(self, access_token, max_workers=8, priority=INTERACTIVE):
+        # max_workers: bu analizörün aynı anda bekleyebileceği istek sayısı; genel sınır zamanlayıcıda
         self.access_token = access_token
-        self.base_url = "https://api.spotify.com/v1"
-        self.headers = {
-            "Authorization": f"Bearer {self.access_token}"
-        }
+        self.max_workers = max_workers
+        self.priority = priority
+        self.base_url = SPOTIFY_API_URL
+        self.client = SpotifyClient(access_token, priority=priority, base_url=self.base_url,
+                                    max_concurrency=max_workers)
+        # Son analizde eksik kalan (önbelleğe yazılmayan) playlist anahtarları
+        self.incomplete = set()
 
     def get_all_playlists(self):
-        playlists = []
-        url = f"{self.base_url}/me/playlists?limit=50"
+        # Süre aşımında None: çağıran listeyi saklamaz, sonraki yüklemede yeniden ister
+        try:
+            return run(self.client.playlists())
+        except FutureTimeoutError:
+            print("Spotify playlists request timed out")
+            return None
 
-        while url:
-            response = requests.get(url, headers=self.headers)
-            data = response.json()
-            playlists.extend(data["items"])
-            url = data["next"]
+    def get_playlist_details(self, playlist_id):
+        return run(self.client.playlist(playlist_id))
 
-        return playlists
+    def get_playlist_tracks_page(self, playlist_id, offset, limit=100):
+        return run(self.client.playlist_tracks_page(playlist_id, offset, limit))
 
-    def get_playlist_details(self, playlist_id):
-        url = f"{self.base_url}/playlists/{playlist_id}"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+    def fetch_playlists(self, playlist_ids, concurrent=True):
+        # Her playlist'in detayı ve kalan şarkı sayfaları birlikte istenir; sayfalar ve
+        # playlist'ler giriş sırasıyla birleştirilir, böylece çıktı deterministik kalır.
+        # Süre aşımında hiçbir playlist dönmez; hepsi eksik sayılır.
+        try:
+            return run(self.client.playlists_details(playlist_ids, concurrent))
+        except FutureTimeoutError:
+            print("Spotify playlist details request timed out")
+            return [None] * len(playlist_ids)
 
     def get_top_playlists(self, playlists, n=3):
         sorted_playlists = sorted(playlists, key=lambda x: x["tracks"]["total"], reverse=True)
         return sorted_playlists[:n]
 
     def extract_artist_ids_from_playlist(self, playlist):
-        artist_ids = []
-        tracks = playlist["tracks"]["items"]
-        for item in tracks:
-            track = item.get("track")
-            if not track:
-                continue
-            for artist in track.get("artists", []):
-                artist_id = artist.get("id")
-                if artist_id:
-                    artist_ids.append(artist_id)
-        return artist_ids
+        return playlist_artist_ids(playlist)
+
+    def iter_genres_from_playlists(self, playlists, concurrent=True):
+        # Playlist içeriği değişmediyse (aynı snapshot_id) önceki analiz kullanılır,
+        # sadece snapshot'ı değişen playlist'ler yeniden çekilip analiz edilir.
+        # Önce önbellekten gelen kısmi sonuç, sonra tam sonuç üretilir. Bir sayfası veya sanatçı
+        # grubu alınamayan playlist gösterilir ama önbelleğe yazılmaz; sonraki yüklemede yeniden denenir.
+        keys = [analysis_key(playlist) or playlist["id"] for playlist in playlists]
+        cache_keys = {analysis_key(playlist) for playlist in playlists} - {None}
+        results = playlist_cache.get_many([key for key in keys if key in cache_keys])
+        stale = [playlist for playlist, key in zip(playlists, keys) if key not in results]
+        self.incomplete = set()
+
+        if results and stale:
+            yield merge_playlist_analyses(keys, results)
+
+        if stale:
+            fresh, incomplete = self._analyze_playlists(stale, concurrent)
+            playlist_cache.put_many(
+                {key: value for key, value in fresh.items() if key in cache_keys and key not in incomplete}
+            )
+            results.update(fresh)
+            # Detayları hiç alınamayanlar da eksik sayılır
+            self.incomplete = incomplete | {key for key in keys if key not in results}
+
+        yield merge_playlist_analyses(keys, results)
+
+    def analyze_genres_from_playlists(self, playlists, concurrent=True):
+        for genre_counts, playlist_summaries in self.iter_genres_from_playlists(playlists, concurrent):
+            pass
+        return genre_counts, playlist_summaries
 
-    def analyze_genres_from_playlists(self, playlists):
+    def _analyze_playlists(self, playlists, concurrent=True):
         from collections import Counter
-        genre_counts = Counter()
-        playlist_summaries = []
 
-        for playlist in playlists:
-            details = self.get_playlist_details(playlist["id"])
-            if not details:
+        fetched = []
+        for playlist, details in zip(playlists, self.fetch_playlists([p["id"] for p in playlists], concurrent)):
+            if not details or "tracks" not in details:
                 continue
-            artist_ids = self.extract_artist_ids_from_playlist(details)
+            fetched.append((playlist, details, self.extract_artist_ids_from_playlist(details)))
+
+        artist_genres = get_artists_genres(
+            [artist_id for _, _, artist_ids in fetched for artist_id in artist_ids],
+            self.access_token,
+            self.priority,
+        )
 
+        results = {}
+        incomplete = set()
+        for playlist, details, artist_ids in fetched:
+            key = analysis_key(playlist) or playlist["id"]
+            genre_counts = Counter()
             for artist_id in artist_ids:
-                genres = get_artist_genres(artist_id, self.access_token)
-                genre_counts.update(genres)
+                genre_counts.update(artist_genres.get(artist_id, []))
+            if details.get("incomplete") or any(artist_id not in artist_genres for artist_id in artist_ids):
+                incomplete.add(key)
 
-            summary = {
-                "name": details.get("name", "Bilinmeyen Playlist"),
-                "image": details.get("images", [{}])[0].get("url", ""),
-                "track_count": details.get("tracks", {}).get("total", 0)
+            results[key] = {
+                "genres": dict(genre_counts),
+                "summary": playlist_summary(details),
             }
-            playlist_summaries.append(summary)
 
-        return genre_counts, playlist_summaries
+        return results, incomplete
+
+
+def playlist_summary(playlist):
+    return {
+        "name": playlist.get("name", "Bilinmeyen Playlist"),
+        "image": (playlist.get("images") or [{}])[0].get("url", ""),
+        "track_count": playlist.get("tracks", {}).get("total", 0)
+    }
+
+
+def merge_playlist_analyses(keys, results):
+    from collections import Counter
+    genre_counts = Counter()
+    playlist_summaries = []
+    for key in keys:
+        analysis = results.get(key)
+        if analysis is None:
+            continue
+        genre_counts.update(analysis["genres"])
+        playlist_summaries.append(analysis["summary"])
+    return genre_counts, playlist_summaries
+
+
+def analysis_key(playlist):
+    snapshot_id = playlist.get("snapshot_id")
+    if not snapshot_id:
+        return None
+    return f"{playlist['id']}:{snapshot_id}"
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+# Katalogdaki filmler için önceden çözülmüş afiş URL'leri.
+# Biçim: {"version": 1, "posters": {title: [url, fetched_at]}}
+POSTER_INDEX_PATH = os.path.join("DATA", "poster_index.json")
+POSTER_MISS = "N/A"
+
+
+def load_poster_index(path=POSTER_INDEX_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("posters", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_poster_index(entries, path=POSTER_INDEX_PATH):
+    # Yarım yazılmış dosya bırakmamak için geçici dosya + atomik rename
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "posters": entries}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def poster_urls(path=POSTER_INDEX_PATH):
+    return {title: entry[0] for title, entry in load_poster_index(path).items()}
+
+
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def is_stale(entry, now, max_age, miss_max_age):
+    url, fetched_at = entry
+    age = now - fetched_at
+    return age > (miss_max_age if url == POSTER_MISS else max_age)
+
+
+def catalog_titles(catalog_path):
+    titles = pd.read_csv(catalog_path, encoding="ISO-8859-1", on_bad_lines="skip", usecols=["title"])["title"]
+    return list(dict.fromkeys(titles.dropna().astype(str)))
+
+
+def build_poster_index(catalog_path, index_path=POSTER_INDEX_PATH, omdb_url=None, workers=8, rate=10.0,
+                       max_age=30 * 24 * 3600, miss_max_age=3 * 24 * 3600, limit=None, checkpoint_every=200):
+    from imdb_movie_poster import fetch_poster_url
+
+    entries = load_poster_index(index_path)
+    now = time.time()
+    titles = catalog_titles(catalog_path)
+    pending = [
+        title for title in titles
+        if title not in entries or is_stale(entries[title], now, max_age, miss_max_age)
+    ]
+    if limit:
+        pending = pending[:limit]
+
+    print(f"{len(titles)} titles in catalog, {len(pending)} to fetch")
+    limiter = RateLimiter(rate)
+
+    def fetch(title):
+        limiter.wait()
+        try:
+            return fetch_poster_url(title, omdb_url=omdb_url)
+        except Exception as e:
+            print(f"Poster fetch error: {e} - {title}")
+            return None
+
+    fetched = failed = 0
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch, title): title for title in pending}
+        for future in as_completed(futures):
+            url = future.result()
+            if url is None:
+                # Geçici hata: eski kayıt (varsa) korunur, bir sonraki çalıştırmada tekrar denenir
+                failed += 1
+                continue
+            entries[futures[future]] = [url, time.time()]
+            fetched += 1
+            if fetched % checkpoint_every == 0:
+                save_poster_index(entries, index_path)
+
+    save_poster_index(entries, index_path)
+    elapsed = time.time() - started
+    print(f"Fetched {fetched}, failed {failed} in {elapsed:.1f}s -> {index_path}")
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the offline title -> poster URL index.")
+    parser.add_argument("--catalog", default=os.path.join("DATA", "movie_df_ml.csv"))
+    parser.add_argument("--output", default=POSTER_INDEX_PATH)
+    parser.add_argument("--omdb-url", default=None, help="OMDb endpoint, e.g. a local stand-in server")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=10.0, help="max requests per second")
+    parser.add_argument("--max-age-days", type=float, default=30)
+    parser.add_argument("--miss-max-age-days", type=float, default=3)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    build_poster_index(
+        args.catalog,
+        index_path=args.output,
+        omdb_url=args.omdb_url,
+        workers=args.workers,
+        rate=args.rate,
+        max_age=args.max_age_days * 24 * 3600,
+        miss_max_age=args.miss_max_age_days * 24 * 3600,
+        limit=args.limit,
+    )
+
+
+if __name__ == "__main__":
+    main()
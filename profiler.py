@@ -0,0 +1,188 @@
+import cProfile
+import marshal
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import telemetry
+
+# Developer mode'dan istenen tek bir yeniden çalıştırmanın profili. Sonuç PROFILE_DIR altına
+# .pstats (snakeviz/pstats ile açılır) ve flame graph araçlarına uygun collapsed-stack
+# ("a;b;c 12" satırları) dosyası olarak yazılır. İstenmediği sürece hiçbir şey çalışmaz.
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("DATA", "profiles"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
+MAX_SAMPLE_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 300))
+MIN_COLLAPSED_SECONDS = 1e-5
+MAX_STACK_DEPTH = 128
+MODES = ("cProfile", "sampling")
+
+
+def frame_label(key):
+    filename, line, name = key
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class SamplingProfiler:
+    # Betik iş parçacığını ve o an bu yeniden çalıştırmanın işini yapan havuz işçilerini (telemetry.propagate
+    # ile kayda bağlanan işler) sabit aralıklarla örnekler; diğer oturumların işleri karışmaz.
+    # cProfile'ın aksine havuzdaki HTTP işleri de görünür ve ek yük çağrı sayısından bağımsızdır.
+    def __init__(self, thread_id, recorder=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.recorder = recorder
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _targets(self):
+        targets = {ident: "<worker>" for ident in telemetry.threads_for(self.recorder)}
+        targets[self.thread_id] = "<script>"
+        return targets
+
+    def _run(self):
+        deadline = time.monotonic() + MAX_SAMPLE_SECONDS
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident, root in self._targets().items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.append(("~", 0, root))
+                self.samples[tuple(reversed(stack))] += 1
+
+    def stats(self):
+        # Örneklerden pstats sözlüğü: öz/kapsayıcı süre = örnek sayısı * aralık
+        self_counts, total_counts = Counter(), Counter()
+        edges = defaultdict(Counter)
+        for stack, n in self.samples.items():
+            stack = stack[1:]
+            if not stack:
+                continue
+            self_counts[stack[-1]] += n
+            for key in set(stack):
+                total_counts[key] += n
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges[callee][caller] += n
+
+        stats = {}
+        for key, total in total_counts.items():
+            tt, ct = self_counts[key] * self.interval, total * self.interval
+            callers = {caller: (n, n, 0.0, n * self.interval) for caller, n in edges[key].items()}
+            stats[key] = (total, total, tt, ct, callers)
+        return stats
+
+    def collapsed(self):
+        return {stack: n for stack, n in self.samples.items()}
+
+
+def collapse_call_graph(stats):
+    # cProfile yığın kaydetmez; çağrı grafiği kökten yürünerek süre, her kenarın
+    # kümülatif payına göre yollara dağıtılır (özyinelemeli çağrılar kesilir)
+    callees = defaultdict(list)
+    for callee, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller].append((callee, edge[3]))
+
+    stacks = Counter()
+
+    def walk(key, path, share):
+        path = path + (key,)
+        self_time = stats[key][2] * share
+        if self_time >= MIN_COLLAPSED_SECONDS:
+            stacks[path] += int(self_time * 1e6)
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees[key]:
+            callee_total = stats[callee][3]
+            if callee in path or callee_total <= 0 or edge_time * share < MIN_COLLAPSED_SECONDS:
+                continue
+            walk(callee, path, share * edge_time / callee_total)
+
+    for key, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(key, (), 1.0)
+    return stacks
+
+
+def top_functions(stats, n=25):
+    rows = [
+        {
+            "function": frame_label(key),
+            "calls": nc,
+            "self_ms": tt * 1000,
+            "cumulative_ms": ct * 1000,
+        }
+        for key, (_, nc, tt, ct, _) in stats.items()
+    ]
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:n]
+
+
+def write_collapsed(stacks, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, value in sorted(stacks.items()):
+            if value > 0:
+                f.write(";".join(frame_label(key).replace(";", ",") for key in stack) + f" {value}\n")
+
+
+class ProfileSession:
+    def __init__(self, mode="cProfile"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        self.mode = mode
+        self.started = time.perf_counter()
+        if mode == "cProfile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = SamplingProfiler(threading.get_ident(), telemetry.current_recorder())
+            self._profiler.start()
+
+    def stop(self, top_n=25, directory=None):
+        if self.mode == "cProfile":
+            self._profiler.disable()
+            self._profiler.create_stats()
+            stats = self._profiler.stats
+            stacks = collapse_call_graph(stats)
+        else:
+            self._profiler.stop()
+            stats = self._profiler.stats()
+            stacks = self._profiler.collapsed()
+        duration_ms = (time.perf_counter() - self.started) * 1000
+
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}-{self.mode}")
+        with open(f"{base}.pstats", "wb") as f:
+            marshal.dump(stats, f)
+        write_collapsed(stacks, f"{base}.collapsed")
+        print(f"Profile ({self.mode}, {duration_ms:.0f} ms) written to {base}.pstats")
+
+        return {
+            "mode": self.mode,
+            "duration_ms": duration_ms,
+            "pstats": f"{base}.pstats",
+            "collapsed": f"{base}.collapsed",
+            "top": top_functions(stats, top_n),
+        }
+
+
+def start(mode="cProfile"):
+    return ProfileSession(mode)
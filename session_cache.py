@@ -0,0 +1,45 @@
+import hashlib
+import streamlit as st
+from pipeline import queue_tracks
+
+# Oturum başına hesaplanmış analizler: kuyruk/playlist içeriğinin özeti -> genre_counts,
+# seçilen tür ve öneri sonucu. Girdiler değişmediyse yeniden çalıştırmada ağ ve model işi yapılmaz.
+MAX_ENTRIES = 8
+
+
+def content_key(kind, ids):
+    digest = hashlib.sha1("\n".join(map(str, ids)).encode("utf-8")).hexdigest()
+    return f"{kind}:{digest}"
+
+
+def queue_key(queue_data):
+    return content_key("queue", [track.get("id") or track.get("name") for track in queue_tracks(queue_data)])
+
+
+def playlists_key(playlists):
+    return content_key("playlists", [f"{p['id']}:{p.get('snapshot_id', '')}" for p in playlists])
+
+
+def _cache():
+    if "analysis_cache" not in st.session_state:
+        st.session_state.analysis_cache = {}
+    return st.session_state.analysis_cache
+
+
+def get_analysis(key):
+    return _cache().get(key, {})
+
+
+def store_analysis(key, **values):
+    cache = _cache()
+    entry = cache.pop(key, {})
+    entry.update(values)
+    cache[key] = entry
+    while len(cache) > MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    return entry
+
+
+def clear_analyses():
+    st.session_state.analysis_cache = {}
+    st.session_state.all_playlists = None
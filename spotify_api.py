@@ -1,44 +1,88 @@
 # spotify_api.py
 import streamlit as st
-import requests
+import os
+from concurrent.futures import TimeoutError as FutureTimeoutError, as_completed
+from cache_store import CacheStore
+from spotify_async import SPOTIFY_API_URL, ARTISTS_BATCH_SIZE, INTERACTIVE, RUN_TIMEOUT, SpotifyClient, run, submit
+
+# Senkron arayüz: çağrılar spotify_async'in ortak zamanlayıcısından geçer
 
 
 def get_user_queue(access_token):
-    url = "https://api.spotify.com/v1/me/player/queue"
-    headers = {
-        "Authorization": f"Bearer {access_token}"
+    try:
+        return run(SpotifyClient(access_token).queue())
+    except FutureTimeoutError:
+        return {"error": "timeout", "message": "Spotify queue request timed out"}
+
+
+# Sanatçı türleri herkese açık ve herkes için aynı: token'dan bağımsız, kalıcı önbellek
+artist_cache = CacheStore(
+    os.getenv("ARTIST_CACHE_PATH", os.path.join("DATA", "cache.sqlite")),
+    table="artist_genres",
+    ttl=float(os.getenv("ARTIST_CACHE_TTL", 7 * 24 * 3600)),
+    memory_size=int(os.getenv("ARTIST_CACHE_MEMORY_SIZE", 20000)),
+)
+
+
+def _get_artists_batch(artist_ids, access_token):
+    return run(SpotifyClient(access_token).artists(artist_ids))
+
+
+def iter_artists_genres(artist_ids, access_token, priority=INTERACTIVE):
+    # Önce önbellekteki sanatçılar, sonra 50'lik gruplar birlikte istenip tamamlandıkça parça parça döner.
+    # Alınamayan grubun (veya süre aşımında bekleyenlerin) sanatçıları sonuçta hiç yer almaz;
+    # türsüz sanatçılar ise boş listeyle döner.
+    unique_ids = list(dict.fromkeys(artist_id for artist_id in artist_ids if artist_id))
+    cached = artist_cache.get_many(unique_ids)
+    if cached:
+        yield cached
+    missing = [artist_id for artist_id in unique_ids if artist_id not in cached]
+    client = SpotifyClient(access_token, priority=priority)
+    futures = {
+        submit(client.artists(missing[start:start + ARTISTS_BATCH_SIZE])): missing[start:start + ARTISTS_BATCH_SIZE]
+        for start in range(0, len(missing), ARTISTS_BATCH_SIZE)
     }
+    # Etkileşimli yüklemeler run() ile aynı süre sınırına tabi; toplu işler kuyrukta beklemeye devam eder
+    timeout = RUN_TIMEOUT if priority == INTERACTIVE else None
+    try:
+        completed = as_completed(futures, timeout=timeout)
+        while True:
+            try:
+                future = next(completed)
+            except (StopIteration, FutureTimeoutError):
+                break
+            batch = futures[future]
+            fetched = future.result()
+            if fetched is None:
+                continue
+            artist_cache.put_many(fetched)
+            yield {artist_id: fetched.get(artist_id, []) for artist_id in batch}
+    finally:
+        # Tüketici erken bıraktıysa bekleyen istekler iptal edilir
+        for future in futures:
+            future.cancel()
 
-    response = requests.get(url, headers=headers)
 
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return {"error": response.status_code, "message": response.text}
+def get_artists_genres(artist_ids, access_token, priority=INTERACTIVE):
+    # Tekrarlanan sanatçıları ayıkla, 50'lik gruplar halinde tek istekte çek
+    genres = {}
+    for resolved in iter_artists_genres(artist_ids, access_token, priority):
+        genres.update(resolved)
+    return genres
+
 
-@st.cache_data(show_spinner=False)
 def get_artist_genres(artist_id, access_token):
-    url = f"https://api.spotify.com/v1/artists/{artist_id}"
-    headers = {
-        "Authorization": f"Bearer {access_token}"
-    }
-    res = requests.get(url, headers=headers)
-    print("SPOTIFY GET ARTIST ENDPOINT STATUS CODE: " + str(res.status_code))
-    if res.status_code == 200:
-        return res.json().get("genres", [])
-    else:
-        return []
+    return get_artists_genres([artist_id], access_token).get(artist_id, [])
 
 @st.cache_data(show_spinner=False)
-def get_user_profile(access_token):
-    url = "https://api.spotify.com/v1/me"
-    headers = {
-        "Authorization": f"Bearer {access_token}"
-    }
+def _fetch_user_profile(access_token):
+    return run(SpotifyClient(access_token).profile())
+
 
-    res = requests.get(url, headers=headers)
-    if res.status_code == 200:
-        return res.json()
-    else:
-        print(f"Spotify user fetch error: {res.status_code} - {res.text}")
+def get_user_profile(access_token):
+    # Süre aşımı önbelleğe girmesin diye yakalama önbellekli fonksiyonun dışında
+    try:
+        return _fetch_user_profile(access_token)
+    except FutureTimeoutError:
+        print("Spotify user fetch timed out")
         return None
\ No newline at end of file
@@ -0,0 +1,342 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import requests
+
+import http_client
+import telemetry
+
+# Spotify çağrıları için süreç geneli asyncio istemcisi. Tüm oturumların istekleri tek bir olay
+# döngüsünde, ortak bir token-bucket zamanlayıcıdan geçer: uçuştaki istek sayısı sınırlı,
+# etkileşimli sayfa yüklemeleri arka plan işlerinden önce, 429 görülünce hız yarıya iner ve
+# başarılı yanıtlarla azar azar geri artar (AIMD). HTTP'nin kendisi http_client'ın havuzlanmış
+# oturumlarıyla döngünün iş parçacıklarında yapılır.
+SPOTIFY_API_URL = os.getenv("SPOTIFY_API_URL", "https://api.spotify.com/v1")
+RATE = float(os.getenv("SPOTIFY_RATE", 50))
+BURST = float(os.getenv("SPOTIFY_BURST", 100))
+MIN_RATE = float(os.getenv("SPOTIFY_MIN_RATE", 1))
+# Her başarılı yanıtta hız, hedef hızın bu oranı kadar artar
+RATE_RECOVERY = float(os.getenv("SPOTIFY_RATE_RECOVERY", 0.02))
+MAX_IN_FLIGHT = int(os.getenv("SPOTIFY_MAX_IN_FLIGHT", 16))
+# Senkron sarmalayıcıların (run) bir sonucu en fazla bekleyeceği süre
+RUN_TIMEOUT = float(os.getenv("SPOTIFY_RUN_TIMEOUT", 120))
+ARTISTS_BATCH_SIZE = 50
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_loop = None
+_scheduler = None
+# Aynı anda istenen aynı GET'ler (aynı URL, parametreler ve token) tek istekte birleşir: anahtar -> (öncelik, görev)
+_in_flight = {}
+_loop_lock = threading.Lock()
+
+
+class Throttled(Exception):
+    # Retry-After sınırı aştığında bekleyen etkileşimli isteklere 429 yanıtıyla hemen dönülür
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+class RateScheduler:
+    # Yalnızca olay döngüsünün iş parçacığından kullanılır
+    def __init__(self, loop, rate=RATE, burst=BURST, max_in_flight=MAX_IN_FLIGHT, min_rate=MIN_RATE):
+        self.loop = loop
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._tokens = float(burst)
+        self._updated = loop.time()
+        self._blocked_until = 0.0
+        self._cooldown_until = 0.0
+        self._rejected_until = 0.0
+        self._rejection = None
+        self._waiters = []
+        self._order = itertools.count()
+        self._timer = None
+
+    async def acquire(self, priority=INTERACTIVE):
+        if priority == INTERACTIVE and self.loop.time() < self._rejected_until:
+            raise Throttled(self._rejection)
+        future = self.loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Slot verildikten hemen sonra iptal edildiyse slotu geri ver
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self, status=None, retry_after=None):
+        self.in_flight -= 1
+        now = self.loop.time()
+        if status == 429:
+            # Aynı aşımın uçuştaki diğer isteklerden gelen 429'ları hızı tekrar düşürmez
+            if now >= self._cooldown_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            # Zamanlayıcı en fazla MAX_RETRY_AFTER bekler; daha uzun süreler reject() ile ele alınır
+            block = min(retry_after if retry_after is not None else 1.0, http_client.MAX_RETRY_AFTER)
+            self._blocked_until = max(self._blocked_until, now + block)
+            self._cooldown_until = max(self._cooldown_until, self._blocked_until + 1.0 / self.rate)
+        elif status is not None and status < 500:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY)
+        self._dispatch()
+
+    def reject(self, response, retry_after):
+        # Retry-After süresi boyunca etkileşimli istekler beklemeden bu 429 yanıtını alır;
+        # arka plan işleri sınırlanmış blok süresini bekleyip yeniden dener
+        self._rejected_until = max(self._rejected_until, self.loop.time() + retry_after)
+        self._rejection = response
+        waiters = []
+        for waiter in self._waiters:
+            priority, _, future = waiter
+            if priority == INTERACTIVE:
+                if not future.done():
+                    future.set_exception(Throttled(response))
+            else:
+                waiters.append(waiter)
+        heapq.heapify(waiters)
+        self._waiters = waiters
+
+    def snapshot(self):
+        return {
+            "rate": self.rate,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "blocked_for": max(0.0, self._blocked_until - self.loop.time()),
+            "rejecting_for": max(0.0, self._rejected_until - self.loop.time()),
+        }
+
+    def _refill(self):
+        now = self.loop.time()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return now
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = self._refill()
+        while self._waiters and self.in_flight < self.max_in_flight:
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+                break
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                break
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            self.in_flight += 1
+            future.set_result(None)
+        else:
+            return
+        self._timer = self.loop.call_later(delay, self._dispatch)
+
+
+def get_loop():
+    global _loop, _scheduler
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT))
+                _scheduler = RateScheduler(loop)
+                threading.Thread(target=loop.run_forever, name="spotify-async", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def get_scheduler():
+    get_loop()
+    return _scheduler
+
+
+def set_rate(rate, burst=None):
+    # Süreç başına hedef hız; ör. toplu çalıştırmada genel limit işçi süreçlerine bölünür
+    scheduler = get_scheduler()
+
+    def apply():
+        scheduler.rate = scheduler.max_rate = rate
+        if burst is not None:
+            scheduler.burst = burst
+            scheduler._tokens = min(scheduler._tokens, burst)
+
+    get_loop().call_soon_threadsafe(apply)
+
+
+async def _with_recorder(recorder, coro):
+    telemetry.attach(recorder)
+    return await coro
+
+
+def submit(coro):
+    # Senkron koddan: coroutine ortak döngüde çalışır, concurrent.futures.Future döner
+    return asyncio.run_coroutine_threadsafe(_with_recorder(telemetry.current_recorder(), coro), get_loop())
+
+
+def run(coro, timeout=RUN_TIMEOUT):
+    # Süre aşılırsa coroutine iptal edilir ve TimeoutError yükselir; betik iş parçacığı asılı kalmaz
+    future = submit(coro)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
+
+
+def _forget(key, entry, _task):
+    # Yerine daha yüksek öncelikli bir istek geçtiyse onun kaydı silinmez
+    if _in_flight.get(key) is entry:
+        del _in_flight[key]
+
+
+class SpotifyClient:
+    def __init__(self, access_token, priority=INTERACTIVE, base_url=None, max_concurrency=8):
+        self.headers = {"Authorization": f"Bearer {access_token}"}
+        self.priority = priority
+        self.base_url = base_url or SPOTIFY_API_URL
+        self.max_concurrency = max_concurrency
+
+    async def get(self, url, params=None):
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}/{url.lstrip('/')}"
+        key = (url, tuple(sorted((params or {}).items())), self.headers["Authorization"])
+        entry = _in_flight.get(key)
+        # Yalnızca aynı veya daha yüksek öncelikli bir isteğe katılınır; etkileşimli bir istek
+        # arka plan işinin kuyruk sırasını beklemez
+        if entry is None or entry[0] > self.priority:
+            task = asyncio.ensure_future(self._get(url, params))
+            entry = _in_flight[key] = (self.priority, task)
+            task.add_done_callback(functools.partial(_forget, key, entry))
+        else:
+            task = entry[1]
+            telemetry.count("spotify_coalesced")
+        # Bekleyenlerden biri iptal edilirse ortak istek diğerleri için sürer
+        return await asyncio.shield(task)
+
+    async def _get(self, url, params):
+        scheduler = get_scheduler()
+        loop = asyncio.get_running_loop()
+        call = functools.partial(http_client.request, "GET", url, headers=self.headers, params=params, max_retries=0)
+
+        for attempt in range(http_client.MAX_RETRIES + 1):
+            try:
+                with telemetry.span("spotify.wait", priority=PRIORITY_NAMES.get(self.priority, self.priority)):
+                    await scheduler.acquire(self.priority)
+            except Throttled as e:
+                telemetry.count("spotify_rejected", priority=PRIORITY_NAMES.get(self.priority, self.priority))
+                return e.response
+            try:
+                response = await loop.run_in_executor(None, telemetry.propagate(call))
+            except (requests.ConnectionError, requests.Timeout):
+                scheduler.release()
+                if attempt == http_client.MAX_RETRIES:
+                    raise
+                await asyncio.sleep(http_client.backoff_delay(attempt))
+                continue
+            except BaseException:
+                scheduler.release()
+                raise
+
+            retry_after = http_client.retry_after_seconds(response)
+            scheduler.release(response.status_code, retry_after)
+            if response.status_code not in http_client.RETRY_STATUSES or attempt == http_client.MAX_RETRIES:
+                return response
+            if response.status_code == 429:
+                telemetry.count("spotify_throttled", priority=PRIORITY_NAMES.get(self.priority, self.priority))
+                if retry_after is not None and retry_after > http_client.MAX_RETRY_AFTER:
+                    scheduler.reject(response, retry_after)
+                    return response
+                # Retry-After süresini zamanlayıcı uygular: o süre boyunca kimseye slot verilmez
+                continue
+            await asyncio.sleep(http_client.backoff_delay(attempt, response))
+
+    async def gather(self, coros, concurrent=True):
+        # Kullanıcı başına eşzamanlılık sınırı; genel sınır zamanlayıcıda
+        if not concurrent:
+            return [await coro for coro in coros]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(coro):
+            async with semaphore:
+                return await coro
+
+        return await asyncio.gather(*(limited(coro) for coro in coros))
+
+    async def queue(self):
+        response = await self.get("me/player/queue")
+        if response.status_code == 200:
+            return response.json()
+        return {"error": response.status_code, "message": response.text}
+
+    async def profile(self):
+        response = await self.get("me")
+        if response.status_code == 200:
+            return response.json()
+        print(f"Spotify user fetch error: {response.status_code} - {response.text}")
+        return None
+
+    async def playlists(self):
+        # İlk sayfadaki total'e göre kalan sayfalar birlikte istenir
+        response = await self.get("me/playlists", params={"limit": 50})
+        data = response.json()
+        playlists = list(data["items"])
+        limit = data.get("limit") or 50
+        offsets = range(data.get("offset", 0) + len(playlists), data.get("total", 0), limit) if data.get("next") else []
+        pages = await self.gather(self.get("me/playlists", params={"offset": o, "limit": limit}) for o in offsets)
+        for page in pages:
+            playlists.extend(page.json().get("items", []))
+        return playlists
+
+    async def playlist_tracks_page(self, playlist_id, offset, limit=100):
+        # Hata yanıtında None: çağıran, şarkıları eksik playlist'i tam sanmamalı
+        response = await self.get(f"playlists/{playlist_id}/tracks", params={"offset": offset, "limit": limit})
+        if response.status_code != 200:
+            print(f"Spotify playlist tracks error: {response.status_code} - {playlist_id} @ {offset}")
+            return None
+        return response.json()
+
+    async def playlist(self, playlist_id, concurrent=True):
+        # Detaylar (ilk 100 şarkı dahil) ve kalan şarkı sayfaları; sayfalar sırayla birleştirilir.
+        # Alınamayan sayfa varsa detaylar "incomplete" ile işaretlenir.
+        details = (await self.get(f"playlists/{playlist_id}")).json()
+        tracks = details.get("tracks") if isinstance(details, dict) else None
+        if not tracks or not tracks.get("next"):
+            return details
+        limit = tracks.get("limit") or 100
+        start = tracks.get("offset", 0) + len(tracks.get("items", []))
+        offsets = range(start, tracks.get("total", 0), limit)
+        pages = await self.gather((self.playlist_tracks_page(playlist_id, o, limit) for o in offsets), concurrent)
+        for page in pages:
+            if page is None:
+                details["incomplete"] = True
+                continue
+            tracks["items"].extend(page.get("items", []))
+        return details
+
+    async def playlists_details(self, playlist_ids, concurrent=True):
+        return await self.gather((self.playlist(playlist_id, concurrent) for playlist_id in playlist_ids), concurrent)
+
+    async def artists(self, artist_ids):
+        # En fazla 50 sanatçı; id -> türler. Hata yanıtında None (türsüz sanatçılardan ayırt etmek için)
+        response = await self.get("artists", params={"ids": ",".join(artist_ids)})
+        if response.status_code != 200:
+            print("SPOTIFY GET ARTISTS ENDPOINT STATUS CODE: " + str(response.status_code))
+            return None
+        return {artist["id"]: artist.get("genres", []) for artist in response.json().get("artists", []) if artist}
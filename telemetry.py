@@ -0,0 +1,222 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Hafif zamanlayıcı/sayaç API'si. Her span hem süreç geneli histogramlara (Prometheus metni
+# olarak dışa aktarılabilir) hem de o anki Streamlit yeniden çalıştırmasının kaydına yazılır.
+PREFIX = "music2movie"
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_recorder = contextvars.ContextVar("telemetry_recorder", default=None)
+# propagate ile sarılmış bir işi o an çalıştıran iş parçacığı -> işin ait olduğu kayıt
+_thread_recorders = {}
+_server = None
+
+
+class Recorder:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, labels, start, duration):
+        with self._lock:
+            self.spans.append({
+                "span": name,
+                "labels": ", ".join(f"{k}={v}" for k, v in sorted(labels.items())),
+                "start_ms": (start - self.started) * 1000,
+                "duration_ms": duration * 1000,
+            })
+
+    def add_count(self, name, value, labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def summary(self):
+        # Span adına göre toplam süre ve çağrı sayısı
+        totals = {}
+        for entry in self.spans:
+            total = totals.setdefault(entry["span"], {"span": entry["span"], "calls": 0, "total_ms": 0.0})
+            total["calls"] += 1
+            total["total_ms"] += entry["duration_ms"]
+        return sorted(totals.values(), key=lambda t: t["total_ms"], reverse=True)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def start_rerun():
+    recorder = Recorder()
+    _recorder.set(recorder)
+    return recorder
+
+
+def current_recorder():
+    return _recorder.get()
+
+
+def attach(recorder):
+    # asyncio görevleri gibi başka bir bağlamda çalışan kodu verilen kayda bağlar
+    return _recorder.set(recorder)
+
+
+def propagate(fn):
+    # Thread havuzundaki işlerin span'leri de çağıranın kaydına düşsün diye
+    recorder = _recorder.get()
+
+    def wrapper(*args, **kwargs):
+        token = _recorder.set(recorder)
+        ident = threading.get_ident()
+        previous = _thread_recorders.get(ident)
+        _thread_recorders[ident] = recorder
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if previous is None:
+                _thread_recorders.pop(ident, None)
+            else:
+                _thread_recorders[ident] = previous
+            _recorder.reset(token)
+
+    return wrapper
+
+
+def threads_for(recorder):
+    # Şu anda bu kayıt adına iş yapan havuz iş parçacıkları (ör. profil örneklemesi için)
+    if recorder is None:
+        return []
+    return [ident for ident, owner in list(_thread_recorders.items()) if owner is recorder]
+
+
+def observe(name, seconds, **labels):
+    key = (name, _label_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][i] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+
+def count(name, value=1, **labels):
+    if not value:
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.add_count(name, value, labels)
+
+
+@contextmanager
+def span(name, **labels):
+    # Etiketler blok içinde güncellenebilir (ör. HTTP durum kodu)
+    start = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        duration = time.perf_counter() - start
+        observe(name, duration, **labels)
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder.add_span(name, labels, start, duration)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def export_prometheus():
+    with _lock:
+        histograms = {key: {**value, "buckets": list(value["buckets"])} for key, value in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = [
+        f"# HELP {PREFIX}_span_seconds Duration of instrumented spans.",
+        f"# TYPE {PREFIX}_span_seconds histogram",
+    ]
+    for (name, labels), histogram in sorted(histograms.items()):
+        base = (("span", name),) + labels
+        for bound, value in zip(BUCKETS, histogram["buckets"]):
+            lines.append(f"{PREFIX}_span_seconds_bucket{_format_labels(base, [('le', bound)])} {value}")
+        lines.append(f"{PREFIX}_span_seconds_bucket{_format_labels(base, [('le', '+Inf')])} {histogram['count']}")
+        lines.append(f"{PREFIX}_span_seconds_sum{_format_labels(base)} {histogram['sum']:.6f}")
+        lines.append(f"{PREFIX}_span_seconds_count{_format_labels(base)} {histogram['count']}")
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        for (counter_name, labels), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f"{PREFIX}_{name}_total{_format_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(export_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = export_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def export_from_env():
+    # METRICS_PORT: /metrics uç noktası, METRICS_FILE: her yeniden çalıştırmada yazılan dosya
+    port = os.getenv("METRICS_PORT")
+    if port:
+        try:
+            start_metrics_server(int(port))
+        except OSError as e:
+            print(f"Metrics server could not start: {e}")
+    path = os.getenv("METRICS_FILE")
+    if path:
+        write_prometheus(path)